@@ -0,0 +1,167 @@
+"""
+Opt-in persistent HTTP cache for the controlled browser, and cache hit reporting.
+
+Brave starts from a cleaned profile for every flow, so each login downloads the auth bundle,
+fonts and checking-page assets again. With DISK_CACHE_DIR set the browser is launched with
+--disk-cache-dir pointing at a directory outside the profile, which the session cleanup
+never touches, and CacheWarmer can fill it from a throwaway headless instance while the
+Unity app is still starting.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from devtools import AUTH_ORIGINS, connect_browser, wait_for_devtools
+
+DISK_CACHE_DIR = os.getenv("DISK_CACHE_DIR") or None
+
+# Debugging port of the warm-up instance, away from the controlled browser's
+WARM_PORT = 9223
+
+
+def cache_args(cache_dir=DISK_CACHE_DIR):
+    """Browser arguments that enable the persistent cache, if configured."""
+    if not cache_dir:
+        return []
+    os.makedirs(cache_dir, exist_ok=True)
+    return [f"--disk-cache-dir={os.path.abspath(cache_dir)}"]
+
+
+class CacheWarmer:
+    """Loads the auth origin into the persistent cache from a headless browser, in the background.
+
+    The warm-up instance uses its own temporary profile, so it doesn't touch the session data
+    of the default profile; call wait() before launching the controlled browser, which must
+    not share the cache directory with a running instance. Warming is best effort: if it
+    isn't done in time, wait() kills the instance rather than hold up the launch.
+    """
+
+    def __init__(self, browser_path, cache_dir=DISK_CACHE_DIR, urls=AUTH_ORIGINS, port=WARM_PORT):
+        self.browser_path = browser_path
+        self.cache_dir = cache_dir
+        self.urls = list(urls)
+        self.port = port
+        self._thread = None
+        self._process = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        if self.cache_dir and self.browser_path and os.path.exists(self.browser_path):
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=5):
+        """Block until warming has finished, for at most `timeout` seconds.
+
+        Returns False if it was still running, in which case the warm-up instance is killed so
+        it lets go of the cache directory.
+        """
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            return True
+        self.stop()
+        return False
+
+    def stop(self):
+        """Kill the warm-up instance, if running. Its temporary profile is removed in the background."""
+        with self._lock:
+            self._stopped = True
+            process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def _run(self):
+        start = time.monotonic()
+        profile_dir = tempfile.mkdtemp(prefix="passport_cache_warm_")
+        process = None
+        try:
+            with self._lock:
+                if self._stopped:
+                    return
+                process = self._process = subprocess.Popen([
+                    self.browser_path,
+                    "--headless=new",
+                    f"--remote-debugging-port={self.port}",
+                    f"--user-data-dir={profile_dir}",
+                    *cache_args(self.cache_dir),
+                    "--no-first-run",
+                    "--no-default-browser-check",
+                    "about:blank",
+                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wait_for_devtools(port=self.port, timeout=30)
+            with connect_browser(self.port) as browser:
+                page = browser.new_page()
+                for url in self.urls:
+                    page.navigate(url)
+            print(f"Warmed browser cache with {len(self.urls)} page(s) in {time.monotonic() - start:.2f}s")
+        except Exception as e:
+            if not self._stopped:
+                print(f"Could not warm browser cache: {e}")
+        finally:
+            self._process = None
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+class CacheMonitor:
+    """Counts how many responses in a tab came from the disk cache, and roughly how many bytes that saved."""
+
+    def __init__(self, page):
+        self.page = page
+        self.responses = 0
+        self.hits = 0
+        self.bytes_saved = 0
+        self._hit_ids = {}
+
+    def start(self):
+        self.page.client.add_listener(self._on_event)
+        self.page.send("Network.enable")
+        return self
+
+    def stop(self, flow):
+        self.page.client.remove_listener(self._on_event)
+        self.page.try_send("Network.disable")
+        self.bytes_saved += sum(self._hit_ids.values())
+        self._hit_ids.clear()
+        if self.responses:
+            print(f"Browser cache during {flow}: {self.hits}/{self.responses} responses from disk cache "
+                  f"({self.hits / self.responses:.0%}), ~{self.bytes_saved / 1024:.0f} KiB not downloaded")
+
+    def _on_event(self, method, params, session_id):
+        if session_id != self.page.session_id:
+            return
+        if method == "Network.responseReceived":
+            response = params["response"]
+            if response.get("url", "").startswith("data:"):
+                return
+            self.responses += 1
+            if response.get("fromDiskCache"):
+                self.hits += 1
+                headers = {k.lower(): v for k, v in response.get("headers", {}).items()}
+                try:
+                    self.bytes_saved += int(headers["content-length"])
+                except (KeyError, ValueError):
+                    # No length header: count the body as it is read out of the cache instead
+                    self._hit_ids[params["requestId"]] = 0
+        elif method == "Network.dataReceived" and params["requestId"] in self._hit_ids:
+            self._hit_ids[params["requestId"]] += params.get("dataLength", 0)
@@ -0,0 +1,146 @@
+"""
+Prepares Brave's default profile for a launch from a prebuilt Preferences template.
+
+Patching Preferences used to mean a json load and dump of a potentially multi-MB file on
+every launch, and the session restore directories were deleted with rmtree. Instead the
+patched Preferences is built into PROFILE_TEMPLATE_DIR on the first launch of a test run.
+Later launches copy it into place byte for byte and rename the session directories out of
+the way, removing them in the background.
+
+Preferences Brave saves during a run are discarded at its next launch. Rebuilding once per
+run picks up whatever the profile has since, e.g. prefs migrated by a Brave update.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Brave thinks it shut down cleanly and opens a new tab, instead of forcing session restore
+CLEAN_EXIT_PREFS = {
+    "profile": {
+        "exit_type": "Normal",
+        "exited_cleanly": True
+    },
+    "session": {
+        "restore_on_startup": 5
+    }
+}
+
+# Lets auth.immutable.com open immutablerunner:// links without a prompt
+PROTOCOL_HANDLER_PREFS = {
+    "profile": {
+        "content_settings": {
+            "exceptions": {
+                "protocol_handler": {
+                    "https://auth.immutable.com,*": {
+                        "setting": 1,
+                        "last_modified": "13000000000000000"
+                    }
+                }
+            }
+        }
+    },
+    "protocol_handler": {
+        "excluded_schemes": {
+            "immutablerunner": False
+        }
+    },
+    "custom_handlers": {
+        "enabled": True
+    }
+}
+
+SESSION_DIRS = ("Sessions", "Session Storage")
+
+PROFILE_TEMPLATE_DIR = os.getenv("PROFILE_TEMPLATE_DIR",
+                                 os.path.join(tempfile.gettempdir(), "passport_profile_template"))
+
+# Templates built by this process; any other is left over from an earlier run and rebuilt
+_built_templates = set()
+
+
+def deep_merge(base, override):
+    for k, v in override.items():
+        if k in base and isinstance(base[k], dict) and isinstance(v, dict):
+            deep_merge(base[k], v)
+        else:
+            base[k] = v
+    return base
+
+
+def template_path(profile_dir, overlays, template_dir=PROFILE_TEMPLATE_DIR):
+    """Path of the template Preferences for this profile and set of overlays."""
+    key = json.dumps([os.path.abspath(profile_dir), overlays], sort_keys=True)
+    return os.path.join(template_dir, hashlib.sha256(key.encode()).hexdigest()[:16], "Preferences")
+
+
+def build_template(profile_dir, overlays, path):
+    """Merge the overlays into the profile's current Preferences and save the result as the template."""
+    prefs = {}
+    try:
+        with open(os.path.join(profile_dir, "Preferences"), "r") as f:
+            prefs = json.load(f)
+    except (OSError, ValueError):
+        # Missing or unreadable: Brave fills in the rest on first start
+        pass
+    for overlay in overlays:
+        deep_merge(prefs, overlay)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(prefs, f)
+    os.replace(temp_path, path)
+    _built_templates.add(path)
+    print(f"Built browser profile template at {path}")
+
+
+def install_template(path, profile_dir):
+    """Copy the template into place as the profile's Preferences."""
+    prefs_path = os.path.join(profile_dir, "Preferences")
+    temp_path = f"{prefs_path}.template"
+    # A plain byte copy, no parsing
+    shutil.copyfile(path, temp_path)
+    os.replace(temp_path, prefs_path)
+
+
+def clear_session_dirs(profile_dir):
+    """Move the session restore directories aside and delete them in the background."""
+    stale = []
+    for name in SESSION_DIRS:
+        session_dir = os.path.join(profile_dir, name)
+        if os.path.isdir(session_dir):
+            stale_dir = f"{session_dir}.stale-{time.time_ns()}"
+            try:
+                os.rename(session_dir, stale_dir)
+                stale.append(stale_dir)
+                print(f"Cleared {name} directory")
+            except OSError as e:
+                print(f"Could not clear {name} directory: {e}")
+    # Also pick up leftovers from runs that exited before deleting theirs
+    if os.path.isdir(profile_dir):
+        stale.extend(os.path.join(profile_dir, entry) for entry in os.listdir(profile_dir)
+                     if ".stale-" in entry and os.path.join(profile_dir, entry) not in stale)
+    if stale:
+        threading.Thread(target=lambda: [shutil.rmtree(d, ignore_errors=True) for d in stale], daemon=True).start()
+
+
+def prepare_profile(profile_dir, overlays, template_dir=PROFILE_TEMPLATE_DIR):
+    """Prepare a stopped browser's profile for launch: clean Preferences and no session to restore.
+
+    The template is built on the first launch of the run; later launches only copy it into place.
+    """
+    start = time.monotonic()
+    os.makedirs(profile_dir, exist_ok=True)
+    clear_session_dirs(profile_dir)
+    path = template_path(profile_dir, overlays, template_dir)
+    try:
+        if path not in _built_templates:
+            build_template(profile_dir, overlays, path)
+        install_template(path, profile_dir)
+        print(f"Browser profile prepared in {(time.monotonic() - start) * 1000:.0f}ms")
+    except Exception as e:
+        print(f"Could not prepare browser profile: {e}")
@@ -0,0 +1,117 @@
+"""
+A single chromedriver + WebDriver session shared by every flow that drives the debug browser.
+
+Attaching through debuggerAddress used to start a fresh chromedriver and negotiate a new
+session for each login and logout. The manager starts chromedriver once per test run and
+hands out the same attached driver, reconnecting only when the browser was restarted or
+the session stopped responding.
+"""
+
+import atexit
+import json
+import urllib.request
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from devtools import DEVTOOLS_PORT, devtools_url
+
+
+class _SharedService(Service):
+    """A chromedriver service that survives driver.quit() and is only stopped by shutdown()."""
+
+    def start(self):
+        process = getattr(self, "process", None)
+        if process is not None and process.poll() is None:
+            return
+        super().start()
+
+    def stop(self):
+        # Called by driver.quit(); the service outlives individual sessions
+        pass
+
+    def shutdown(self):
+        if getattr(self, "process", None) is not None:
+            super().stop()
+            self.process = None
+
+
+class WebDriverSessionManager:
+    """Hands out a WebDriver attached to the debug browser, reusing it between flows."""
+
+    def __init__(self, chromedriver_path, browser_path=None, port=DEVTOOLS_PORT, service_args=None):
+        self.chromedriver_path = chromedriver_path
+        self.browser_path = browser_path
+        self.port = port
+        self.service_args = service_args
+        self._service = None
+        self._driver = None
+        self._browser_ws_url = None
+        atexit.register(self.shutdown)
+
+    def driver(self):
+        """Return a healthy driver attached to the browser, connecting or reconnecting as needed."""
+        if self._driver is not None and not self._healthy():
+            print("Browser session is stale, reconnecting...")
+            self.discard()
+        if self._driver is None:
+            self._connect()
+        return self._driver
+
+    def discard(self):
+        """Drop the current session; the next driver() call attaches a new one."""
+        if self._driver is not None:
+            try:
+                # Only ends the WebDriver session: the browser was not launched by chromedriver
+                self._driver.quit()
+            except WebDriverException:
+                pass
+            self._driver = None
+
+    def shutdown(self):
+        """End the session and stop chromedriver."""
+        self.discard()
+        if self._service is not None:
+            self._service.shutdown()
+            self._service = None
+
+    def _connect(self):
+        options = Options()
+        options.add_experimental_option("debuggerAddress", f"localhost:{self.port}")
+        if self.browser_path:
+            options.binary_location = self.browser_path
+        if self._service is None:
+            self._service = _SharedService(executable_path=self.chromedriver_path, service_args=self.service_args)
+        self._driver = webdriver.Chrome(service=self._service, options=options)
+        self._browser_ws_url = self._current_browser_ws_url()
+        print("Attached WebDriver session to the debug browser")
+
+    def _current_browser_ws_url(self):
+        # Unique per browser process, so a change means the browser was restarted
+        try:
+            with urllib.request.urlopen(devtools_url("/json/version", self.port), timeout=2) as response:
+                return json.load(response).get("webSocketDebuggerUrl")
+        except (OSError, ValueError):
+            return None
+
+    def _healthy(self):
+        if self._service.process is None or self._service.process.poll() is not None:
+            return False
+        if self._current_browser_ws_url() != self._browser_ws_url:
+            return False
+        try:
+            handles = self._driver.window_handles
+            if not handles:
+                return False
+            # The tab the session was on may have been closed since the last flow
+            try:
+                if self._driver.current_window_handle in handles:
+                    return True
+            except WebDriverException:
+                pass
+            self._driver.switch_to.window(handles[0])
+            return True
+        except WebDriverException:
+            return False
@@ -0,0 +1,439 @@
+"""
+A small Chrome DevTools Protocol client that talks straight to the browser's
+--remote-debugging-port websocket, without chromedriver in between.
+
+WebSocket and CDPConnection are asyncio based. CDPClient runs a connection on an event loop
+in a background thread and exposes a blocking API for the test helpers, and Page wraps a
+target session (attached with flatten=True, so every tab shares the one websocket).
+"""
+
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+import struct
+import threading
+import time
+import urllib.parse
+
+_WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+_OP_CONTINUATION = 0x0
+_OP_TEXT = 0x1
+_OP_BINARY = 0x2
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+
+
+class CDPError(RuntimeError):
+    """Raised when the browser answers a command with an error, or the connection is lost."""
+
+
+class WebSocket:
+    """Minimal RFC 6455 client: masked frames out, fragmented/control frames handled on the way in."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, url, timeout=10):
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme != "ws":
+            raise ValueError(f"Unsupported websocket URL: {url}")
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parsed.hostname, parsed.port or 80, limit=2 ** 24), timeout)
+        key = base64.b64encode(os.urandom(16))
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        # No Origin header: DevTools rejects websocket connections from unknown origins
+        writer.write((f"GET {path or '/'} HTTP/1.1\r\nHost: {parsed.netloc}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key.decode()}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        await writer.drain()
+        response = (await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)).decode("latin-1")
+        status, *header_lines = response.split("\r\n")
+        headers = {name.strip().lower(): value.strip()
+                   for name, _, value in (line.partition(":") for line in header_lines if line)}
+        expected = base64.b64encode(hashlib.sha1(key + _WEBSOCKET_GUID).digest()).decode()
+        if " 101 " not in status + " " or headers.get("sec-websocket-accept") != expected:
+            writer.close()
+            raise ConnectionError(f"Websocket handshake with {url} failed: {status}")
+        return cls(reader, writer)
+
+    async def send(self, text):
+        await self._send_frame(_OP_TEXT, text.encode("utf-8"))
+
+    async def recv(self):
+        """Return the next text message. Raises ConnectionError once the connection is closed."""
+        message = b""
+        while True:
+            first, second = await self._reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack("!H", await self._reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack("!Q", await self._reader.readexactly(8))
+            if second & 0x80:
+                mask = await self._reader.readexactly(4)
+                data = _apply_mask(await self._reader.readexactly(length), mask)
+            else:
+                data = await self._reader.readexactly(length)
+
+            if opcode == _OP_PING:
+                await self._send_frame(_OP_PONG, data)
+            elif opcode == _OP_CLOSE:
+                await self.close()
+                raise ConnectionError("Websocket closed by the browser")
+            elif opcode in (_OP_TEXT, _OP_BINARY, _OP_CONTINUATION):
+                message += data
+                if first & 0x80:
+                    return message.decode("utf-8")
+
+    async def close(self):
+        if not self._writer.is_closing():
+            try:
+                await self._send_frame(_OP_CLOSE, b"")
+            except (ConnectionError, RuntimeError):
+                pass
+            self._writer.close()
+
+    async def _send_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+        mask = os.urandom(4)
+        self._writer.write(header + mask + _apply_mask(payload, mask))
+        await self._writer.drain()
+
+
+def _apply_mask(data, mask):
+    # XOR the whole payload at once; much faster than a per-byte loop for large messages
+    repeated = (mask * (len(data) // 4 + 1))[:len(data)]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(data), "big")
+
+
+class CDPConnection:
+    """One DevTools websocket: matches command responses to requests and dispatches events."""
+
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+        self.closed = False
+
+    @classmethod
+    async def connect(cls, url, timeout=10):
+        return cls(await WebSocket.connect(url, timeout))
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        """Send a command and return its result. Raises CDPError if the browser reports an error."""
+        if self.closed:
+            raise CDPError("DevTools connection is closed")
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self._websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise CDPError(f"{method} got no response within {timeout}s")
+        finally:
+            self._pending.pop(message_id, None)
+
+    def add_listener(self, callback):
+        """Call callback(method, params, session_id) for every event. Runs on the event loop thread."""
+        with self._listeners_lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._listeners_lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    async def close(self):
+        self.closed = True
+        self._reader_task.cancel()
+        await self._websocket.close()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(await self._websocket.recv())
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future and not future.done():
+                        if "error" in message:
+                            error = message["error"]
+                            future.set_exception(CDPError(f"{error.get('message')} ({error.get('code')})"))
+                        else:
+                            future.set_result(message.get("result", {}))
+                elif "method" in message:
+                    with self._listeners_lock:
+                        listeners = list(self._listeners)
+                    for listener in listeners:
+                        try:
+                            listener(message["method"], message.get("params", {}), message.get("sessionId"))
+                        except Exception as e:
+                            print(f"CDP event listener failed on {message['method']}: {e}")
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError(f"DevTools connection lost: {e}"))
+
+
+class CDPClient:
+    """Blocking wrapper around CDPConnection, with its event loop running on a daemon thread."""
+
+    def __init__(self, ws_url, timeout=10):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="cdp-client", daemon=True)
+        self._thread.start()
+        try:
+            self._connection = self._run(CDPConnection.connect(ws_url, timeout), timeout + 1)
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    @property
+    def closed(self):
+        return self._connection.closed
+
+    def send(self, method, params=None, session_id=None, timeout=30):
+        return self._run(self._connection.send(method, params, session_id, timeout), timeout + 1)
+
+    def post(self, method, params=None, session_id=None):
+        """Send a command without waiting for its result. Returns a concurrent.futures.Future.
+
+        Unlike send(), this is safe to call from an event listener, which runs on the loop thread."""
+        return asyncio.run_coroutine_threadsafe(self._connection.send(method, params, session_id), self._loop)
+
+    def add_listener(self, callback):
+        self._connection.add_listener(callback)
+
+    def remove_listener(self, callback):
+        self._connection.remove_listener(callback)
+
+    def expect_event(self, method, session_id=None, predicate=None):
+        """Start listening for an event now and return a concurrent.futures.Future for its params.
+
+        Call this before the command that triggers the event, so a fast event isn't missed.
+        """
+        future = concurrent.futures.Future()
+
+        def listener(event_method, params, event_session_id):
+            if (event_method == method and (session_id is None or event_session_id == session_id)
+                    and (predicate is None or predicate(params)) and not future.done()):
+                future.set_result(params)
+                self.remove_listener(listener)
+
+        future.add_done_callback(lambda _: self.remove_listener(listener))
+        self.add_listener(listener)
+        return future
+
+    def close(self):
+        try:
+            self._run(self._connection.close(), 5)
+        except Exception:
+            pass
+        self._stop_loop()
+
+    def _run(self, coroutine, timeout):
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise CDPError(f"DevTools call did not complete within {timeout}s")
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Target helpers, for a client connected to the browser endpoint
+
+    def pages(self):
+        """Return the target info of every open tab."""
+        targets = self.send("Target.getTargets")["targetInfos"]
+        return [target for target in targets if target["type"] == "page"]
+
+    def wait_for_target(self, predicate, timeout=30):
+        """Return the info of the first target, existing or new, for which predicate(target_info) holds.
+
+        Uses target discovery, so a tab is picked up the moment it is created or navigates to a
+        matching URL, without polling the list of targets. Raises TimeoutError.
+        """
+        found = concurrent.futures.Future()
+
+        def listener(method, params, session_id):
+            if method in ("Target.targetCreated", "Target.targetInfoChanged") and session_id is None:
+                target_info = params["targetInfo"]
+                if not found.done() and predicate(target_info):
+                    found.set_result(target_info)
+
+        self.add_listener(listener)
+        try:
+            # Enabling discovery also reports every target that already exists
+            self.send("Target.setDiscoverTargets", {"discover": True})
+            return found.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise TimeoutError(f"No matching target within {timeout}s")
+        finally:
+            self.remove_listener(listener)
+            if not self.closed:
+                self.send("Target.setDiscoverTargets", {"discover": False})
+
+    def attach(self, target_id):
+        """Attach to a target and return a Page for it."""
+        session_id = self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})["sessionId"]
+        return Page(self, target_id, session_id)
+
+    def new_page(self, url="about:blank"):
+        return self.attach(self.send("Target.createTarget", {"url": url})["targetId"])
+
+
+class Page:
+    """A tab attached through a CDPClient, with the handful of page helpers the tests need."""
+
+    def __init__(self, client, target_id, session_id):
+        self.client = client
+        self.target_id = target_id
+        self.session_id = session_id
+        self.send("Page.enable")
+
+    def send(self, method, params=None, timeout=30):
+        return self.client.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    def post(self, method, params=None):
+        return self.client.post(method, params, session_id=self.session_id)
+
+    def try_send(self, method, params=None):
+        """Send a command, ignoring failures. For cleanup that may run after the tab was closed."""
+        try:
+            return self.send(method, params)
+        except CDPError:
+            return None
+
+    def expect_event(self, method, predicate=None):
+        return self.client.expect_event(method, self.session_id, predicate)
+
+    def navigate(self, url, timeout=30):
+        """Navigate and wait for the load event. Returns False if the navigation failed."""
+        loaded = self.expect_event("Page.loadEventFired")
+        result = self.send("Page.navigate", {"url": url}, timeout=timeout)
+        if result.get("errorText"):
+            loaded.cancel()
+            print(f"Navigation to {url} failed: {result['errorText']}")
+            return False
+        try:
+            loaded.result(timeout)
+        except concurrent.futures.TimeoutError:
+            loaded.cancel()
+            print(f"Page did not finish loading within {timeout}s")
+        return True
+
+    def evaluate(self, expression, await_promise=False, timeout=30):
+        """Evaluate a JavaScript expression in the page and return its value."""
+        result = self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True,
+                                                "awaitPromise": await_promise}, timeout=timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(f"JavaScript error: {details.get('exception', {}).get('description') or details.get('text')}")
+        return result["result"].get("value")
+
+    def add_init_script(self, source, run_now=True):
+        """Run `source` in every document this tab loads from now on, and in the current one."""
+        self.send("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        if run_now:
+            self.evaluate(source)
+
+    def add_binding(self, name):
+        """Expose window[name](payload) in the page; every call is pushed back as a Runtime.bindingCalled
+        event, in this and all later documents of the tab."""
+        self.send("Runtime.enable")
+        self.send("Runtime.addBinding", {"name": name})
+
+    def expect_binding_call(self, name):
+        """Return a concurrent.futures.Future for the params of the next call to binding `name`."""
+        return self.expect_event("Runtime.bindingCalled", lambda params: params.get("name") == name)
+
+    def target_info(self):
+        # Answered by the browser, so unlike evaluate() it works mid-navigation
+        return self.client.send("Target.getTargetInfo", {"targetId": self.target_id})["targetInfo"]
+
+    @property
+    def url(self):
+        return self.target_info()["url"]
+
+    @property
+    def title(self):
+        return self.target_info()["title"]
+
+    def content(self):
+        return self.evaluate("document.documentElement.outerHTML")
+
+    def wait_for_function(self, expression, timeout=30, interval=0.1):
+        """Poll a JavaScript expression until it is truthy and return its value. Raises TimeoutError."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = self.evaluate(expression)
+                if value:
+                    return value
+            except CDPError:
+                # The page may be mid-navigation
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for {expression}")
+            time.sleep(min(interval, remaining))
+
+    def find_first(self, selectors):
+        """Return the first of the candidate selectors that matches an element, or None.
+
+        All candidates are resolved in a single round trip."""
+        return self.evaluate(f"{json.dumps(list(selectors))}.find(s => document.querySelector(s)) || null")
+
+    def wait_for_any(self, selectors, timeout=30):
+        """Wait until one of the candidate selectors matches and return it. Raises TimeoutError."""
+        return self.wait_for_function(
+            f"{json.dumps(list(selectors))}.find(s => document.querySelector(s)) || null", timeout)
+
+    def click(self, selector):
+        """Click the first element matching the selector. Returns False if there is none."""
+        return bool(self.evaluate(
+            f"(() => {{ const el = document.querySelector({json.dumps(selector)});"
+            f" if (!el || el.disabled) return false; el.click(); return true; }})()"))
+
+    def type(self, selector, text):
+        """Focus the element matching the selector and type text into it, like a user would.
+
+        Any text already in the element is replaced."""
+        self.evaluate(f"(el => {{ el.focus(); if (el.select) el.select(); }})"
+                      f"(document.querySelector({json.dumps(selector)}))")
+        # insertText goes through the browser's input pipeline, so React-controlled inputs update
+        self.send("Input.insertText", {"text": text})
+
+    def press_enter(self):
+        key = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13}
+        self.send("Input.dispatchKeyEvent", {"type": "keyDown", "text": "\r", **key})
+        self.send("Input.dispatchKeyEvent", {"type": "keyUp", **key})
@@ -0,0 +1,106 @@
+"""
+Helpers for the browser's DevTools HTTP endpoint, exposed by --remote-debugging-port.
+"""
+
+import json
+import os
+import time
+import urllib.parse
+import urllib.request
+
+from cdp import CDPClient
+from wait import http_ok, wait_until
+
+DEVTOOLS_PORT = 9222
+
+# With BROWSER_POOL=1 one debug browser is kept alive for the whole suite and only reset
+# between login/logout flows, instead of being restarted for each of them
+BROWSER_POOL = os.getenv("BROWSER_POOL", "").lower() in ("1", "true", "yes")
+
+# Origins whose cookies and storage are cleared when a pooled browser is reset
+AUTH_ORIGINS = ["https://auth.immutable.com"]
+
+# Open the auth origin in a background tab as soon as the browser is up (PREWARM_AUTH=0 to disable)
+PREWARM_AUTH = os.getenv("PREWARM_AUTH", "1").lower() not in ("0", "false", "no")
+
+
+def devtools_url(path, port=DEVTOOLS_PORT):
+    return f"http://127.0.0.1:{port}{path}"
+
+
+def wait_for_devtools(port=DEVTOOLS_PORT, timeout=30):
+    """Block until the DevTools endpoint answers /json/version.
+
+    Returns the version info and how long the browser took to come up, in seconds.
+    Raises WaitTimeout if it doesn't answer within `timeout` seconds.
+    """
+    start = time.monotonic()
+    body = wait_until(http_ok(devtools_url("/json/version", port), timeout=1), timeout=timeout,
+                      interval=0.05, max_interval=0.5, description=f"DevTools on port {port}")
+    return json.loads(body), time.monotonic() - start
+
+
+def devtools_available(port=DEVTOOLS_PORT):
+    """Return True if a browser is already answering on the DevTools port."""
+    return bool(http_ok(devtools_url("/json/version", port), timeout=1)())
+
+
+def list_pages(port=DEVTOOLS_PORT):
+    """Return the DevTools target info of every open tab."""
+    with urllib.request.urlopen(devtools_url("/json/list", port), timeout=5) as response:
+        return [target for target in json.load(response) if target.get("type") == "page"]
+
+
+def new_page(url="about:blank", port=DEVTOOLS_PORT):
+    """Open a new tab and return its target info."""
+    # Recent Chromium only accepts PUT here
+    request = urllib.request.Request(devtools_url(f"/json/new?{urllib.parse.quote(url, safe=':/')}", port),
+                                     method="PUT")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)
+
+
+def close_page(target_id, port=DEVTOOLS_PORT):
+    with urllib.request.urlopen(devtools_url(f"/json/close/{target_id}", port), timeout=5):
+        pass
+
+
+def connect_browser(port=DEVTOOLS_PORT, timeout=10):
+    """Open a CDP connection to the browser endpoint. Returns a CDPClient."""
+    with urllib.request.urlopen(devtools_url("/json/version", port), timeout=timeout) as response:
+        ws_url = json.load(response)["webSocketDebuggerUrl"]
+    return CDPClient(ws_url, timeout=timeout)
+
+
+def cdp_call(ws_url, method, params=None, timeout=10):
+    """Send a single CDP command to a target's websocket and return its result."""
+    with CDPClient(ws_url, timeout=timeout) as client:
+        return client.send(method, params, timeout=timeout)
+
+
+def reset_browser(origins=AUTH_ORIGINS, port=DEVTOOLS_PORT):
+    """Bring a running debug browser back to a clean state between flows.
+
+    Leaves a single blank tab and clears cookies and storage of the given origins, which is
+    all a login/logout flow depends on. Much cheaper than restarting the browser.
+    """
+    start = time.monotonic()
+    old_pages = list_pages(port)
+    blank = new_page("about:blank", port)
+    for page in old_pages:
+        close_page(page["id"], port)
+    for origin in origins:
+        cdp_call(blank["webSocketDebuggerUrl"], "Storage.clearDataForOrigin",
+                 {"origin": origin, "storageTypes": "all"})
+    print(f"Reset pooled browser ({len(old_pages)} tab(s) closed) in {time.monotonic() - start:.2f}s")
+
+
+def prewarm_origins(origins=AUTH_ORIGINS, port=DEVTOOLS_PORT):
+    """Open each origin in a background tab, so DNS, TLS and static assets are warm for the real login tab.
+
+    Doesn't wait for the tabs to load. Returns their target ids, which flows looking for the
+    login tab should ignore.
+    """
+    with connect_browser(port) as browser:
+        return [browser.send("Target.createTarget", {"url": origin, "background": True})["targetId"]
+                for origin in origins]
@@ -0,0 +1,250 @@
+"""
+A local stand-in for the part of the MailSlurp API the OTP fetch uses.
+
+Implements GET /waitForLatestEmail (inboxId, timeout, unreadOnly, since, before) and
+/waitForNthEmail (the same plus index and sort) for any inbox, returning Passport-style OTP
+emails, so the whole OTP path can be run and timed offline.
+Emails are put in the inbox with deliver(), or POST /deliver?inboxId=...&code=...&delay=..., or
+automatically whenever a wait finds nothing with auto-delivery on.
+
+Run it and point the tests at it with MAILSLURP_HOST:
+
+    python src/fake_mailslurp.py --port 8025 --delay 2 --auto-deliver
+    MAILSLURP_HOST=http://127.0.0.1:8025 python src/fetch_otp.py
+
+Or measure the fetch latency end to end with --benchmark N.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PASSPORT_EMAIL_TEMPLATE = """<html><body>
+<p>Your Immutable Passport verification code is:</p>
+<h1 style="font-size:32px;letter-spacing:4px">{code}</h1>
+<p>This code expires in 10 minutes.</p>
+</body></html>"""
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_time(value):
+    return value.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class FakeMailSlurp(ThreadingHTTPServer):
+    """Serves the fake API from a background thread. Emails are kept in memory per inbox."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.0, auto_deliver=False, host="127.0.0.1"):
+        super().__init__((host, port), _Handler)
+        self.delay = delay
+        self.auto_deliver = auto_deliver
+        self.emails = []
+        self._changed = threading.Condition()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def deliver(self, inbox_id, code=None, delay=None):
+        """Put an OTP email in the inbox after `delay` seconds (the server default if None). Returns the code."""
+        code = code or f"{random.randrange(10 ** 6):06d}"
+        delay = self.delay if delay is None else delay
+        if delay > 0:
+            threading.Timer(delay, self._add, (inbox_id, code)).start()
+        else:
+            self._add(inbox_id, code)
+        return code
+
+    def _add(self, inbox_id, code):
+        now = datetime.now(timezone.utc)
+        email = {
+            "id": str(uuid.uuid4()),
+            "userId": "00000000-0000-0000-0000-000000000000",
+            "inboxId": inbox_id,
+            "to": ["unity-sdk@mailslurp.net"],
+            "from": "noreply@mail.immutable.com",
+            "subject": f"{code} is your verification code",
+            "body": PASSPORT_EMAIL_TEMPLATE.format(code=code),
+            "isHTML": True,
+            "attachments": [],
+            "createdAt": now,
+            "read": False,
+            "teamAccess": True,
+        }
+        with self._changed:
+            self.emails.append(email)
+            self._changed.notify_all()
+
+    def wait_for_latest_email(self, inbox_id, timeout, unread_only=False, since=None, before=None):
+        """Return the newest matching email once there is one, marking it read, or None after `timeout` seconds."""
+        return self._wait_for_email(inbox_id, timeout, unread_only, since, before, lambda emails: emails[-1])
+
+    def wait_for_nth_email(self, inbox_id, index, timeout, unread_only=False, since=None, before=None,
+                           sort="ASC"):
+        """Like wait_for_latest_email, but for the index-th (zero based) matching email in `sort` order."""
+        def pick(emails):
+            if len(emails) <= index:
+                return None
+            return emails[index] if sort.upper() == "ASC" else emails[-1 - index]
+        return self._wait_for_email(inbox_id, timeout, unread_only, since, before, pick)
+
+    def _wait_for_email(self, inbox_id, timeout, unread_only, since, before, pick):
+        def found():
+            # Oldest first
+            emails = sorted((email for email in self.emails
+                             if email["inboxId"] == inbox_id
+                             and not (unread_only and email["read"])
+                             and (since is None or email["createdAt"] >= since)
+                             and (before is None or email["createdAt"] <= before)),
+                            key=lambda e: e["createdAt"])
+            return pick(emails) if emails else None
+
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            if not found() and self.auto_deliver:
+                # Stands in for the email the submitted login would trigger
+                self.deliver(inbox_id)
+            while not (email := found()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+            email["read"] = True
+            return dict(email)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path not in ("/waitForLatestEmail", "/waitForNthEmail"):
+            return self._reply(404, {"message": f"Not found: {url.path}"})
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if "inboxId" not in query:
+            return self._reply(400, {"message": "inboxId is required"})
+        try:
+            # timeout (ms) bounds the whole request. MailSlurp's delay is the longest gap between its
+            # polls; this server is woken as soon as an email arrives, so it is accepted and ignored
+            filters = dict(
+                timeout=int(query.get("timeout", 60000)) / 1000,
+                unread_only=query.get("unreadOnly", "false").lower() == "true",
+                since=_parse_time(query["since"]) if "since" in query else None,
+                before=_parse_time(query["before"]) if "before" in query else None)
+            if url.path == "/waitForNthEmail":
+                email = self.server.wait_for_nth_email(query["inboxId"], int(query.get("index", 0)),
+                                                       sort=query.get("sort", "ASC"), **filters)
+            else:
+                email = self.server.wait_for_latest_email(query["inboxId"], **filters)
+        except ValueError as e:
+            return self._reply(400, {"message": str(e)})
+        if email is None:
+            return self._reply(408, {"message": "No matching email received before timeout"})
+        email["createdAt"] = email["updatedAt"] = _format_time(email["createdAt"])
+        self._reply(200, email)
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/deliver":
+            return self._reply(404, {"message": f"Not found: {url.path}"})
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if "inboxId" not in query:
+            return self._reply(400, {"message": "inboxId is required"})
+        delay = float(query["delay"]) if "delay" in query else None
+        code = self.server.deliver(query["inboxId"], query.get("code"), delay)
+        self._reply(200, {"code": code})
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep test output readable
+        pass
+
+
+def benchmark(server, runs, delay):
+    """Time start_otp_wait() against the fake server: how long after delivery each code arrives."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import fetch_otp
+    from fetch_otp import INBOX_ID, start_otp_wait
+
+    fetch_otp.configure(server.url, api_key=os.getenv("MAILSLURP_API_KEY") or "fake")
+    # Same clock as the server, and the previous run's email must not count for the next one
+    fetch_otp.CLOCK_SKEW = timedelta(0)
+
+    latencies = []
+    for _ in range(runs):
+        otp = start_otp_wait()
+        start = time.monotonic()
+        expected = server.deliver(INBOX_ID, delay=delay)
+        code = otp.result(timeout=delay + 30)
+        latencies.append(time.monotonic() - start - delay)
+        if code != expected:
+            raise AssertionError(f"Fetched {code}, expected {expected}")
+    print(f"OTP fetched {statistics.median(latencies) * 1000:.1f}ms after delivery "
+          f"(median of {runs}, min {min(latencies) * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for MailSlurp's waitForLatestEmail endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before a delivered email shows up")
+    parser.add_argument("--auto-deliver", action="store_true",
+                        help="deliver a new OTP email whenever a wait finds none")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="time N OTP fetches through fetch_otp against the server, then exit")
+    args = parser.parse_args()
+
+    server = FakeMailSlurp(args.port, args.delay, args.auto_deliver, args.host)
+    if args.benchmark:
+        with server:
+            benchmark(server, args.benchmark, args.delay)
+        return
+
+    print(f"Fake MailSlurp listening on {server.url} (set MAILSLURP_HOST={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import os
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
 import mailslurp_client
 from mailslurp_client.api import WaitForControllerApi
 import re
@@ -6,14 +9,38 @@ import re
 INBOX_ID = "f0e72738-1683-403f-88ee-d57cc03ec312"
 EMAIL = "unity-sdk@mailslurp.net"
 
+# Override to point the OTP fetch at a local stand-in
+MAILSLURP_HOST = os.getenv("MAILSLURP_HOST", "https://api.mailslurp.com")
+
+# Shared by every fetch, so its connection pool (and TLS session) is reused between logins
+_waitfor_controller = None
+_client_lock = threading.Lock()
+_api_key = None
+
+# Emails stamped up to this long before the wait was armed still count, in case the clocks differ
+CLOCK_SKEW = timedelta(seconds=5)
+
+def configure(host, api_key=None):
+    """Point later fetches at another MailSlurp host, e.g. a local stand-in, and optionally another API key."""
+    global MAILSLURP_HOST, _api_key, _waitfor_controller
+    with _client_lock:
+        MAILSLURP_HOST = host
+        if api_key is not None:
+            _api_key = api_key
+        # Built again with the new settings on the next fetch
+        _waitfor_controller = None
+
 def get_mailslurp_client():
-    configuration = mailslurp_client.Configuration()
-    configuration.api_key['x-api-key'] = os.getenv('MAILSLURP_API_KEY')
-    # Use the correct API base URL as per official docs
-    configuration.host = "https://api.mailslurp.com"
-    api_client = mailslurp_client.ApiClient(configuration)
-    waitfor_controller = WaitForControllerApi(api_client)
-    return waitfor_controller
+    global _waitfor_controller
+    with _client_lock:
+        if _waitfor_controller is None:
+            configuration = mailslurp_client.Configuration()
+            configuration.api_key['x-api-key'] = _api_key or os.getenv('MAILSLURP_API_KEY')
+            # Use the correct API base URL as per official docs
+            configuration.host = MAILSLURP_HOST
+            api_client = mailslurp_client.ApiClient(configuration)
+            _waitfor_controller = WaitForControllerApi(api_client)
+        return _waitfor_controller
 
 def extract_otp_from_email(email_body):
     # Pattern to match 6-digit code in Passport emails
@@ -23,14 +50,56 @@ def extract_otp_from_email(email_body):
         return match.group(1)
     return None
 
-def fetch_code():
+def fetch_code(since=None, timeout=60000, index=None):
     waitfor_controller = get_mailslurp_client()
-    email = waitfor_controller.wait_for_latest_email(inbox_id=INBOX_ID, timeout=60000, unread_only=True)
+    # With `since`, only emails received after it count and read ones aren't skipped: an earlier
+    # wait that is still running may already have read the email this one is waiting for
+    kwargs = {"since": since} if since else {}
+    if index is None:
+        email = waitfor_controller.wait_for_latest_email(inbox_id=INBOX_ID, timeout=timeout,
+                                                         unread_only=since is None, **kwargs)
+    else:
+        # The index-th email (zero based, oldest first), however late the ones before it arrive
+        email = waitfor_controller.wait_for_nth_email(inbox_id=INBOX_ID, index=index, timeout=timeout,
+                                                      unread_only=False, sort="ASC", **kwargs)
     if email:
         otp = extract_otp_from_email(email.body)
         return otp
     return None
 
+def start_otp_wait(timeout=60000, previous=None):
+    """Start waiting for the next OTP email in the background. Call this before submitting the email.
+
+    Returns a Future that resolves to the code (or None) as soon as MailSlurp has the email,
+    so the login doesn't need to sleep before fetching it. When the email is submitted again,
+    pass the previous wait's Future as `previous`: Passport sends a new code and the old one
+    stops working, so the new wait takes the email after the ones earlier submits triggered,
+    counted from when the first wait was armed, rather than whichever arrives next."""
+    if previous is None:
+        since = datetime.now(timezone.utc) - CLOCK_SKEW
+        index = None
+    else:
+        since = previous.since
+        index = (previous.index or 0) + 1
+    future = Future()
+    future.since, future.index = since, index
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fetch_code(since, timeout, index))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # A daemon thread rather than an executor: an abandoned long-poll (the login failed, or the
+    # wait was re-armed) mustn't keep the interpreter from exiting until MailSlurp times out
+    threading.Thread(target=run, name="otp-wait", daemon=True).start()
+    return future
+
 if __name__ == "__main__":
+    import time
+    start = time.monotonic()
     code = fetch_code()
-    print(code)
\ No newline at end of file
+    print(code)
+    print(f"Fetched from {MAILSLURP_HOST} in {time.monotonic() - start:.2f}s")
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Drives the Passport web login (email, OTP, optional consent) in a tab attached over CDP.
+
+Rather than waiting for each expected element in turn and timing out through fallback
+selectors, every tick runs one JavaScript probe that classifies the page, and the driver
+loop performs whatever that state calls for.
+"""
+
+import concurrent.futures
+import json
+import os
+import tempfile
+import time
+
+from stats_store import StatsStore
+
+# Page states reported by the probe
+EMAIL = "email"
+OTP = "otp"
+CONSENT = "consent"
+CHECKING = "checking"
+REDIRECTED = "redirected"
+ERROR = "error"
+LOADING = "loading"
+
+EMAIL_SELECTORS = ['[data-testid="TextInput__input"]']
+
+SUBMIT_SELECTORS = [
+    'button[type="submit"]',                    # Primary - always works
+    'button[data-testid*="submit"]',           # Fallback with testid
+    'form button'                              # Last resort - any form button
+]
+
+OTP_SELECTORS = [
+    'input[data-testid="passwordless_passcode__TextInput--0__input"]',  # Primary - always works
+    'input[data-testid*="passcode"]',      # Fallback - partial testid match
+    'input[type="text"][maxlength="6"]'    # Last resort - by input characteristics
+]
+
+CHECKING_SELECTOR = 'h1[data-testid="checking_title"]'
+
+ERROR_SELECTORS = ['[role="alert"]', '[data-testid*="error"]']
+
+# Seconds to wait for the page to move on before submitting the email again
+RESUBMIT_AFTER = 10
+
+# Seconds to keep watching the checking page for a consent prompt that shows after it
+CONSENT_GRACE = 5
+
+# Where selector hit counts are kept between runs
+SELECTOR_STATS_PATH = os.getenv("SELECTOR_STATS_PATH",
+                                os.path.join(tempfile.gettempdir(), "passport_selector_stats.json"))
+
+PROBE_SCRIPT = """
+(() => {
+    const visible = el => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const first = selectors => selectors.find(s => visible(document.querySelector(s))) || null;
+    if (!AUTH_HOSTS.includes(location.hostname)) {
+        return {state: 'redirected', detail: location.href};
+    }
+    // The consent prompt can show together with the checking title, so look for it first
+    if ([...document.querySelectorAll('button')].some(b => visible(b) && b.textContent.includes('Yes'))) {
+        return {state: 'consent'};
+    }
+    if (document.querySelector(CHECKING_SELECTOR)) {
+        return {state: 'checking'};
+    }
+    const otp = first(OTP_SELECTORS);
+    if (otp) {
+        return {state: 'otp', selector: otp};
+    }
+    const email = first(EMAIL_SELECTORS);
+    if (email) {
+        return {state: 'email', selector: email, submit: first(SUBMIT_SELECTORS)};
+    }
+    const error = ERROR_SELECTORS.map(s => document.querySelector(s)).find(el => visible(el) && el.textContent.trim());
+    if (error) {
+        return {state: 'error', detail: error.textContent.trim()};
+    }
+    return {state: 'loading', detail: document.readyState};
+})()
+"""
+
+CLICK_CONSENT_SCRIPT = """
+(() => {
+    const button = [...document.querySelectorAll('button')].find(b => b.textContent.includes('Yes'));
+    if (button) { button.click(); return true; }
+    return false;
+})()
+"""
+
+
+class LoginError(RuntimeError):
+    """Raised when the web login can't be completed."""
+
+
+class OTPNotReceived(LoginError):
+    """Raised when no OTP could be fetched for the login."""
+
+
+class SelectorStats:
+    """Counts which of the fallback selectors matched, so later runs try the most successful first.
+
+    Counts are kept per group ("email", "submit", "otp") in a small JSON file.
+    """
+
+    def __init__(self, path=SELECTOR_STATS_PATH):
+        self.store = StatsStore(path)
+
+    def order(self, group, selectors):
+        """Return the selectors sorted by hit count, keeping the given order between equals."""
+        group_hits = self.store.section(group)
+        return sorted(selectors, key=lambda selector: -group_hits.get(selector, 0))
+
+    def record(self, group, selector):
+        group_hits = self.store.section(group)
+        group_hits[selector] = group_hits.get(selector, 0) + 1
+        self.store.save()
+
+
+def build_probe(auth_hosts, stats=None):
+    """Return the probe script with the auth hosts and selectors filled in, most successful selectors first."""
+    stats = stats or SelectorStats()
+    script = PROBE_SCRIPT
+    for name, value in (("AUTH_HOSTS", sorted(auth_hosts)), ("CHECKING_SELECTOR", CHECKING_SELECTOR),
+                        ("OTP_SELECTORS", stats.order("otp", OTP_SELECTORS)),
+                        ("EMAIL_SELECTORS", stats.order("email", EMAIL_SELECTORS)),
+                        ("SUBMIT_SELECTORS", stats.order("submit", SUBMIT_SELECTORS)),
+                        ("ERROR_SELECTORS", ERROR_SELECTORS)):
+        script = script.replace(name, json.dumps(value))
+    return script
+
+
+def probe(page, probe_script):
+    """Classify the page in one round trip. Returns a dict with at least a 'state' key."""
+    try:
+        return page.evaluate(probe_script) or {"state": LOADING}
+    except Exception as e:
+        # Most likely mid-navigation, with no document to evaluate in
+        return {"state": LOADING, "detail": str(e)}
+
+
+def drive_login(page, email, start_otp_wait, auth_hosts, timeout=120, interval=0.1, stats=None,
+                callback=None):
+    """Complete the web login in `page` until the checking page shows or the tab leaves the auth pages.
+
+    `start_otp_wait` is called just before each email submit, with the Future it returned for
+    the previous submit as `previous`, and must return a Future resolving to the OTP sent for
+    that submit; the one from the last submit is read once the OTP page is up. The checking
+    page is watched for CONSENT_GRACE seconds in case a consent prompt follows it, unless the
+    `callback` Future (the intercepted deep link, if any) resolves first. Returns the final
+    probe result, whose state is CHECKING or REDIRECTED. Raises OTPNotReceived if no OTP
+    could be fetched, and LoginError on an error page or if the login doesn't finish within
+    `timeout` seconds.
+    """
+    stats = stats or SelectorStats()
+    probe_script = build_probe(auth_hosts, stats)
+    deadline = time.monotonic() + timeout
+    email_submitted_at = None
+    otp = None
+    otp_entered = False
+    checking_since = None
+    last_state = None
+    while True:
+        result = probe(page, probe_script)
+        state = result["state"]
+        if state != last_state:
+            print(f"Login page state: {state}" + (f" ({result['detail']})" if result.get("detail") else ""))
+            last_state = state
+
+        if state == REDIRECTED:
+            return result
+        if state == CHECKING:
+            checking_since = checking_since or time.monotonic()
+            if (time.monotonic() - checking_since >= CONSENT_GRACE
+                    or (callback is not None and callback.done())):
+                return result
+        if state == ERROR:
+            raise LoginError(f"Login page shows an error: {result['detail']}")
+
+        if state == EMAIL and (email_submitted_at is None
+                               or time.monotonic() - email_submitted_at > RESUBMIT_AFTER):
+            print(f"Enter email (field found with selector: {result['selector']})...")
+            stats.record("email", result["selector"])
+            page.type(result["selector"], email)
+            # Armed before every submit, so the wait covers the email however quickly it arrives.
+            # A resubmit makes Passport send a new code; the wait for the old one can't be
+            # interrupted, so it runs out in the background and only the new one is read
+            otp = start_otp_wait(previous=otp)
+            if result.get("submit") and page.click(result["submit"]):
+                print(f"Successfully clicked submit button with selector: {result['submit']}")
+                stats.record("submit", result["submit"])
+            else:
+                print("No submit button found with any selector, pressing Enter...")
+                page.press_enter()
+            email_submitted_at = time.monotonic()
+        elif state == OTP and not otp_entered:
+            print("Get OTP from MailSlurp...")
+            otp = otp or start_otp_wait()
+            try:
+                code = otp.result(timeout=max(0, deadline - time.monotonic()))
+            except concurrent.futures.TimeoutError:
+                raise OTPNotReceived(f"No OTP received within {timeout}s of starting the login")
+            except Exception as e:
+                # e.g. an ApiException from MailSlurp when its own wait times out
+                raise OTPNotReceived(f"Failed to fetch OTP from MailSlurp: {e}") from e
+            if not code:
+                raise OTPNotReceived("Failed to fetch OTP from MailSlurp")
+            print(f"Successfully fetched OTP: {code}")
+            print(f"Found OTP field with selector: {result['selector']}")
+            stats.record("otp", result["selector"])
+            page.type(result["selector"], code)
+            otp_entered = True
+        elif state == CONSENT:
+            if page.evaluate(CLICK_CONSENT_SCRIPT):
+                print("Clicked 'Yes' on consent screen")
+
+        if time.monotonic() > deadline:
+            raise LoginError(f"Login did not complete within {timeout}s (page state: {state})")
+        time.sleep(interval)
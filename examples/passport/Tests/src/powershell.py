@@ -0,0 +1,206 @@
+"""
+A long-lived PowerShell process shared by the Windows test helpers.
+
+Starting powershell.exe costs up to a second each time, and a single login cycle runs around
+ten short scripts. Instead, one host process is started and scripts are sent to it over
+stdin/stdout with a line-based protocol:
+
+    request:   REQ <id> <base64 UTF-8 script>
+    response:  RES <id> <status> <base64 UTF-8 output>
+
+The host runs every script in the same runspace and returns everything it wrote (output,
+errors, Write-Host, ...) as one string. Like powershell.exe -Command, status is 1 if the
+script hit a terminating error and otherwise $LASTEXITCODE of the last native command it ran;
+non-terminating errors (e.g. with -ErrorAction SilentlyContinue) don't make it fail. The
+protocol helpers below don't depend on Windows, so the session can be driven by pwsh or a
+fake host on any platform.
+"""
+
+import atexit
+import base64
+import queue
+import subprocess
+import sys
+import threading
+from itertools import count
+
+# Read by the host: runs each request in a reused runspace and answers on stdout
+HOST_SCRIPT = r'''
+$runspace = [runspacefactory]::CreateRunspace()
+$runspace.Open()
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $parts = $line.Split(' ')
+    if ($parts.Length -ne 3 -or $parts[0] -ne 'REQ') { continue }
+    $script = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($parts[2]))
+    $ps = [powershell]::Create()
+    $ps.Runspace = $runspace
+    $status = 0
+    $runspace.SessionStateProxy.SetVariable('LASTEXITCODE', 0)
+    try {
+        $output = $ps.AddScript("& {`n$script`n} *>&1 | Out-String -Width 4096").Invoke() -join ''
+        $exitCode = $runspace.SessionStateProxy.GetVariable('LASTEXITCODE')
+        if ($exitCode) { $status = $exitCode }
+    } catch {
+        $status = 1
+        $output = $_ | Out-String
+    } finally {
+        $ps.Dispose()
+    }
+    $encoded = [Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes($output))
+    [Console]::Out.WriteLine("RES $($parts[1]) $status $encoded")
+    [Console]::Out.Flush()
+}
+'''
+
+
+class PowerShellError(RuntimeError):
+    """Raised when the PowerShell host dies or answers with something unexpected."""
+
+
+class PowerShellTimeout(PowerShellError, TimeoutError):
+    """Raised when a script doesn't finish in time. The host is restarted for the next request."""
+
+
+def encode_request(request_id, script):
+    """Return the protocol line asking the host to run `script`."""
+    payload = base64.b64encode(script.encode('utf-8')).decode('ascii')
+    return f"REQ {request_id} {payload}\n"
+
+
+def parse_response(line):
+    """Parse a line written by the host into (request_id, status, output).
+
+    Returns None for anything that isn't a response, e.g. a banner or stray console output.
+    """
+    parts = line.strip().split(' ')
+    if len(parts) != 4 or parts[0] != 'RES' or not parts[2].lstrip('-').isdigit():
+        return None
+    try:
+        output = base64.b64decode(parts[3], validate=True).decode('utf-8', errors='replace')
+    except ValueError:
+        return None
+    return parts[1], int(parts[2]), output
+
+
+def host_command(executable="powershell.exe"):
+    """Return the command line that starts a host running HOST_SCRIPT."""
+    encoded = base64.b64encode(HOST_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return [executable, "-NoLogo", "-NoProfile", "-NonInteractive",
+            "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+
+class PowerShellSession:
+    """Runs scripts in one persistent PowerShell process.
+
+    `command` is the command line of the host; by default powershell.exe running HOST_SCRIPT.
+    Anything that speaks the protocol will do, e.g. host_command("pwsh") or a fake host.
+    The host is started on first use and restarted if it dies or a script times out.
+    """
+
+    def __init__(self, command=None):
+        self.command = command or host_command()
+        self._process = None
+        self._responses = None
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def run(self, script, timeout=30):
+        """Run `script` and return a subprocess.CompletedProcess with its output in stdout.
+
+        Raises PowerShellTimeout if it takes longer than `timeout` seconds and PowerShellError
+        if the host can't be started or dies.
+        """
+        with self._lock:
+            process = self._ensure_started()
+            request_id = str(next(self._ids))
+            try:
+                process.stdin.write(encode_request(request_id, script))
+                process.stdin.flush()
+            except OSError as e:
+                self._kill()
+                raise PowerShellError(f"PowerShell host is not accepting requests: {e}") from e
+            while True:
+                try:
+                    line = self._responses.get(timeout=timeout)
+                except queue.Empty:
+                    # The script may still be running; there is no way to interrupt it, so start over
+                    self._kill()
+                    raise PowerShellTimeout(f"PowerShell script did not finish within {timeout}s")
+                if line is None:
+                    self._kill()
+                    raise PowerShellError("PowerShell host exited unexpectedly")
+                response = parse_response(line)
+                if response and response[0] == request_id:
+                    _, status, output = response
+                    return subprocess.CompletedProcess(script, status, stdout=output, stderr='')
+
+    def close(self):
+        """Stop the host process. The session can still be used; it will start a new one."""
+        with self._lock:
+            if self._process and self._process.poll() is None:
+                try:
+                    # End of input makes the host's loop exit
+                    self._process.stdin.close()
+                    self._process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+
+    def _ensure_started(self):
+        if self._process and self._process.poll() is None:
+            return self._process
+        try:
+            self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, text=True, encoding='utf-8', bufsize=1)
+        except OSError as e:
+            raise PowerShellError(f"Could not start PowerShell host: {e}") from e
+        # Lines are read on a thread so a response can be waited for with a timeout
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(self._process, self._responses),
+                         daemon=True).start()
+        return self._process
+
+    @staticmethod
+    def _read_responses(process, responses):
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)
+
+    def _kill(self):
+        if self._process:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the PowerShellSession shared by the helpers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PowerShellSession()
+            atexit.register(_session.close)
+        return _session
+
+
+def run_powershell(script, timeout=30):
+    """Run a PowerShell script and return a subprocess.CompletedProcess with its output.
+
+    Uses the shared persistent session, falling back to a one-off powershell.exe if the
+    session can't be used. Raises subprocess.TimeoutExpired if the script takes too long.
+    """
+    try:
+        return get_session().run(script, timeout=timeout)
+    except PowerShellTimeout as e:
+        raise subprocess.TimeoutExpired(script, timeout) from e
+    except PowerShellError as e:
+        print(f"{e} - falling back to a new powershell.exe", file=sys.stderr)
+    return subprocess.run(["powershell.exe", "-Command", script], capture_output=True, text=True,
+                          timeout=timeout)
@@ -0,0 +1,147 @@
+"""
+Process helpers for the UI tests: keep track of the processes we launch and stop them by
+waiting on their actual exit instead of sleeping for a fixed time.
+"""
+
+import ctypes
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from powershell import run_powershell
+
+# Windows access rights and exit code used by the process queries below
+_PROCESS_TERMINATE = 0x0001
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_STILL_ACTIVE = 259
+_ERROR_ACCESS_DENIED = 5
+
+
+def _kernel32():
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.restype = ctypes.c_void_p
+    kernel32.OpenProcess.argtypes = [ctypes.c_ulong, ctypes.c_int, ctypes.c_ulong]
+    kernel32.GetExitCodeProcess.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong)]
+    kernel32.TerminateProcess.argtypes = [ctypes.c_void_p, ctypes.c_uint]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+    return kernel32
+
+
+def find_pids(pattern):
+    """Return the PIDs of running processes matching `pattern`.
+
+    On Windows this is a Get-Process name (wildcards allowed, e.g. "*brave*"); elsewhere it
+    is matched against the full command line with pgrep -f.
+    """
+    if sys.platform == "win32":
+        result = run_powershell(f"(Get-Process -Name '{pattern}' -ErrorAction SilentlyContinue).Id")
+    else:
+        result = subprocess.run(["pgrep", "-f", pattern], capture_output=True, text=True)
+    return [int(pid) for pid in result.stdout.split() if pid.isdigit()]
+
+
+def pid_exists(pid):
+    """Return True if a process with this PID is still running."""
+    if sys.platform == "win32":
+        kernel32 = _kernel32()
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Access denied means the process exists but belongs to someone else
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        # Reap it first if it's one of our own children, otherwise it lingers as a zombie
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def terminate(pid, force=False):
+    """Ask a process to exit, or kill it outright with force=True."""
+    try:
+        if sys.platform == "win32":
+            if force:
+                kernel32 = _kernel32()
+                handle = kernel32.OpenProcess(_PROCESS_TERMINATE, False, pid)
+                if handle:
+                    kernel32.TerminateProcess(handle, 1)
+                    kernel32.CloseHandle(handle)
+            else:
+                # Without /F taskkill asks the app's windows to close, like clicking the close button
+                subprocess.run(["taskkill", "/PID", str(pid)], capture_output=True)
+        else:
+            os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+
+def wait_for_exit(pids, timeout):
+    """Block until none of the processes are running. Returns True if they all exited in time."""
+    deadline = time.monotonic() + timeout
+    interval = 0.05
+    remaining_pids = list(pids)
+    while True:
+        remaining_pids = [pid for pid in remaining_pids if pid_exists(pid)]
+        if not remaining_pids:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, 0.5)
+
+
+def stop_processes(pids, timeout=10, graceful=True, force_timeout=5):
+    """Stop the processes and wait for them to exit.
+
+    With graceful=True they are asked to exit first and only force-killed if they are still
+    running after `timeout` seconds. Returns True once they have all exited.
+    """
+    pids = [pid for pid in pids if pid_exists(pid)]
+    if not pids:
+        return True
+    for pid in pids:
+        terminate(pid, force=not graceful)
+    if wait_for_exit(pids, timeout):
+        return True
+    if not graceful:
+        return False
+    print(f"Processes {pids} did not exit within {timeout}s, killing them")
+    for pid in pids:
+        terminate(pid, force=True)
+    return wait_for_exit(pids, force_timeout)
+
+
+class ProcessSupervisor:
+    """Remembers the processes the tests launched, by name, so they can be stopped reliably."""
+
+    def __init__(self):
+        self._processes = {}
+
+    def track(self, process, name):
+        """Track a subprocess.Popen or a PID under `name`. Returns the PID."""
+        pid = process.pid if isinstance(process, subprocess.Popen) else int(process)
+        self._processes.setdefault(name, {})[pid] = process
+        return pid
+
+    def pids(self, name):
+        return list(self._processes.get(name, {}))
+
+    def stop(self, name, timeout=10, graceful=True):
+        """Stop every process tracked under `name` and wait for it to exit. Returns True if they all did."""
+        return stop_processes(self._processes.pop(name, {}), timeout=timeout, graceful=graceful)
@@ -0,0 +1,122 @@
+"""
+Opt-in blocking of resources the login pages don't need (images, fonts, analytics, ...).
+
+With BLOCK_REQUESTS=1 the filter pauses matching requests with Fetch.enable and fails them,
+so page transitions don't wait on them. What is blocked is configured with:
+
+    BLOCK_RESOURCE_TYPES  CDP resource types to block (default "Image,Font,Media")
+    BLOCK_URLS            URL glob patterns to block (default: common analytics/telemetry hosts)
+    ALLOW_URLS            URL glob patterns that are never blocked, even if matched above
+
+Sizes of the resources that would be blocked are learned from Network events in earlier
+runs, and unfiltered runs record a baseline login time, so each flow can report roughly how
+many bytes and how much time the filter saved.
+"""
+
+import os
+import tempfile
+from fnmatch import fnmatchcase
+
+from stats_store import StatsStore
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+BLOCK_REQUESTS = os.getenv("BLOCK_REQUESTS", "").lower() in ("1", "true", "yes")
+BLOCK_RESOURCE_TYPES = _env_list("BLOCK_RESOURCE_TYPES", ["Image", "Font", "Media"])
+BLOCK_URLS = _env_list("BLOCK_URLS", [
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*segment.io/*",
+    "*segment.com/*",
+    "*datadoghq.com/*",
+    "*browser-intake-*",
+    "*sentry.io/*",
+    "*hotjar.com/*",
+])
+ALLOW_URLS = _env_list("ALLOW_URLS", [])
+
+# Learned resource sizes and baseline flow times, kept between runs
+REQUEST_STATS_PATH = os.getenv("REQUEST_STATS_PATH",
+                               os.path.join(tempfile.gettempdir(), "passport_request_stats.json"))
+
+
+class RequestFilter:
+    """Blocks non-essential requests in one tab and reports what that saved.
+
+    Always records the sizes of blockable resources it sees load; only blocks when enabled.
+    """
+
+    def __init__(self, page, enabled=BLOCK_REQUESTS, resource_types=BLOCK_RESOURCE_TYPES,
+                 block_urls=BLOCK_URLS, allow_urls=ALLOW_URLS, stats_path=REQUEST_STATS_PATH):
+        self.page = page
+        self.enabled = enabled
+        self.resource_types = set(resource_types)
+        self.block_urls = list(block_urls)
+        self.allow_urls = list(allow_urls)
+        self.stats_path = stats_path
+        self.blocked = []
+        self._requests = {}
+        self._stats = None
+
+    def should_block(self, url, resource_type):
+        if any(fnmatchcase(url, pattern) for pattern in self.allow_urls):
+            return False
+        return resource_type in self.resource_types or any(fnmatchcase(url, pattern) for pattern in self.block_urls)
+
+    def start(self):
+        self._stats = StatsStore(self.stats_path)
+        self.page.client.add_listener(self._on_event)
+        self.page.send("Network.enable")
+        if self.enabled:
+            # Only matching requests are paused, everything else goes straight through
+            patterns = [{"urlPattern": "*", "resourceType": resource_type} for resource_type in sorted(self.resource_types)]
+            patterns += [{"urlPattern": pattern} for pattern in self.block_urls]
+            self.page.send("Fetch.enable", {"patterns": patterns})
+            print(f"Blocking non-essential requests ({len(patterns)} patterns)")
+        return self
+
+    def stop(self, flow, duration=None):
+        """Stop filtering and report the savings for `flow`, which took `duration` seconds.
+
+        Pass duration=None if the flow failed, so its time isn't compared or used as a baseline."""
+        self.page.client.remove_listener(self._on_event)
+        if self.enabled:
+            self.page.try_send("Fetch.disable")
+        self.page.try_send("Network.disable")
+
+        baselines = self._stats.section("baselines")
+        if self.enabled:
+            sizes = self._stats.section("sizes")
+            estimated_bytes = sum(sizes.get(url, 0) for url in self.blocked)
+            known = sum(1 for url in self.blocked if url in sizes)
+            report = (f"Blocked {len(self.blocked)} request(s) during {flow}, "
+                      f"~{estimated_bytes / 1024:.0f} KiB saved ({known} with known sizes)")
+            if duration is not None and flow in baselines:
+                report += f", {baselines[flow] - duration:.2f}s faster than the unfiltered baseline"
+            print(report)
+        elif duration is not None:
+            self._stats.record_average("baselines", flow, duration)
+        self._stats.save()
+
+    def _on_event(self, method, params, session_id):
+        if session_id != self.page.session_id:
+            return
+        if method == "Fetch.requestPaused":
+            url = params["request"]["url"]
+            if self.should_block(url, params.get("resourceType")):
+                self.blocked.append(url)
+                self.page.post("Fetch.failRequest", {"requestId": params["requestId"], "errorReason": "BlockedByClient"})
+            else:
+                self.page.post("Fetch.continueRequest", {"requestId": params["requestId"]})
+        elif method == "Network.requestWillBeSent":
+            self._requests[params["requestId"]] = (params["request"]["url"], params.get("type"))
+        elif method == "Network.loadingFinished":
+            url, resource_type = self._requests.pop(params["requestId"], (None, None))
+            if url and self.should_block(url, resource_type):
+                self._stats.section("sizes")[url] = params.get("encodedDataLength", 0)
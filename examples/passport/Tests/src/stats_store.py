@@ -0,0 +1,41 @@
+"""
+Small JSON documents kept between runs: learned selector orders, resource sizes and step timings.
+"""
+
+import json
+import os
+import tempfile
+
+# Averaged step timings, so a run can report how it compares with earlier ones
+TIMINGS_PATH = os.getenv("TIMINGS_PATH", os.path.join(tempfile.gettempdir(), "passport_timings.json"))
+
+
+class StatsStore:
+    """A JSON object loaded from `path`, saved atomically so an interrupted run can't corrupt it."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def section(self, name):
+        """The dict stored under `name`, created if missing."""
+        return self.data.setdefault(name, {})
+
+    def record_average(self, section, name, value):
+        """Fold `value` into the moving average kept as section[name], so one slow run doesn't skew it."""
+        averages = self.section(section)
+        previous = averages.get(name)
+        averages[name] = value if previous is None else 0.7 * previous + 0.3 * value
+
+    def save(self):
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save {os.path.basename(self.path)}: {e}")
@@ -0,0 +1,367 @@
+"""
+Helpers for following Unity's Player.log from the UI test harness.
+
+The log can grow to hundreds of MB over a long CI session, so rather than re-reading the
+whole file on every poll, readers remember how far they got and only look at new bytes.
+"""
+
+import ctypes
+import ctypes.util
+import mmap
+import os
+import re
+import select
+import struct
+import sys
+import time
+from collections import namedtuple
+
+# Read the log in blocks so a large backlog doesn't need to be held twice in memory
+READ_BLOCK_SIZE = 1024 * 1024
+# Upper bound for an unterminated line carried over between polls
+MAX_CARRY_SIZE = 64 * 1024
+# Block size used when searching the log backwards from the end
+REVERSE_BLOCK_SIZE = 256 * 1024
+
+# Bounds for the adaptive polling used where inotify isn't available
+MIN_POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.25
+
+# Prefixes of the lines that carry auth and logout URLs, from either PassportLogger
+# or the Browser Communications Manager
+URL_PREFIX = r'(?:\[Immutable\] PASSPORT_AUTH_URL: |PASSPORT_AUTH_URL: |LaunchAuthURL : )'
+
+
+class LogTailer:
+    """Incrementally reads lines appended to a log file, remembering where it left off.
+
+    Unity truncates or recreates Player.log when the player restarts. The tailer notices when
+    the file was replaced (different inode), shrank, or no longer holds the bytes it last read,
+    starts again from the top of the new file and bumps its generation.
+    """
+
+    # Number of bytes before the read offset remembered to check the file wasn't rewritten
+    TAIL_SIZE = 64
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.offset = 0
+        self.generation = 0
+        self._carry = b''
+        self._identity = None
+        self._tail = b''
+
+    def read_lines(self):
+        """Return the complete lines appended since the previous call.
+
+        A trailing partial line is kept back until its newline arrives, so callers never
+        see half a URL.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                self._check_rotation(f)
+                f.seek(self.offset)
+                lines = []
+                while True:
+                    block = f.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    self.offset += len(block)
+                    self._tail = (self._tail + block)[-self.TAIL_SIZE:]
+                    lines.extend(self._split(block))
+                return lines
+        except OSError:
+            return []
+
+    def seek_to_end(self):
+        """Skip everything currently in the file, so only lines written from now on are read."""
+        try:
+            with open(self.path, 'rb') as f:
+                self._check_rotation(f)
+                size = os.fstat(f.fileno()).st_size
+                f.seek(max(0, size - self.TAIL_SIZE))
+                self._tail = f.read(self.TAIL_SIZE)
+                self.offset = size
+        except OSError:
+            self._reset()
+            self._identity = None
+        self._carry = b''
+
+    def check_rotation(self):
+        """Start over from the top of the file if it was truncated or replaced since the last read."""
+        try:
+            with open(self.path, 'rb') as f:
+                self._check_rotation(f)
+        except OSError:
+            pass
+
+    def _check_rotation(self, f):
+        stat = os.fstat(f.fileno())
+        identity = (stat.st_dev, stat.st_ino)
+        if self.offset and (identity != self._identity or stat.st_size < self.offset
+                            or not self._tail_matches(f)):
+            self._reset()
+            self.generation += 1
+        self._identity = identity
+
+    def _tail_matches(self, f):
+        f.seek(self.offset - len(self._tail))
+        return f.read(len(self._tail)) == self._tail
+
+    def _reset(self):
+        self.offset = 0
+        self._carry = b''
+        self._tail = b''
+
+    def _split(self, block):
+        parts = (self._carry + block).split(b'\n')
+        carry = parts.pop()
+        if len(carry) > MAX_CARRY_SIZE:
+            # Runaway line with no newline in sight; keep only its tail so memory stays bounded
+            carry = carry[-MAX_CARRY_SIZE:]
+        self._carry = carry
+        return [part.rstrip(b'\r').decode(self.encoding, errors='ignore') for part in parts]
+
+
+# Event types reported by LogScanner
+AUTH_URL = 'auth_url'
+LOGOUT_URL = 'logout_url'
+LOGIN_SUCCESS = 'login_success'
+ERROR = 'error'
+
+LogEvent = namedtuple('LogEvent', ['type', 'value', 'line'])
+
+
+class LogScanner:
+    """Classifies log lines into typed events using a single precompiled regex."""
+
+    PATTERN = re.compile(
+        # Auth and logout URLs
+        URL_PREFIX + r'(?P<url>https?://\S+)'
+        # Signs that the login completed and Unity moved on
+        r'|(?P<success>AuthenticatedScene|COMPLETE_LOGIN_PKCE|LoginPKCESuccess|HandleLoginPkceSuccess'
+        r'|authentication successful|logged in successfully|Passport token received)'
+        # Exceptions and SDK errors, useful context when a login times out
+        r'|(?P<error>\b\w+Exception: .*'
+        r'|\[Immutable\] (?!.*(?:PASSPORT_AUTH_URL|LaunchAuthURL)).*\b(?:[Ee]rror|[Ff]ailed)\b.*)'
+    )
+
+    def scan(self, lines):
+        """Yield a LogEvent for every match in the given lines."""
+        for line in lines:
+            for match in self.PATTERN.finditer(line):
+                yield self._classify(match, line)
+
+    @staticmethod
+    def _classify(match, line):
+        url = match.group('url')
+        if url:
+            event_type = LOGOUT_URL if 'logout' in url or 'im-logged-out' in url else AUTH_URL
+            return LogEvent(event_type, url, line)
+        if match.group('success'):
+            return LogEvent(LOGIN_SUCCESS, match.group('success'), line)
+        return LogEvent(ERROR, match.group('error').strip(), line)
+
+
+class UnityLogMonitor:
+    """Follows a Unity log and keeps the events found in it, so all consumers share one scan.
+
+    Only events from the current app session are kept: they are dropped when the log is
+    truncated or recreated, and when begin_session() is called before (re)starting the app.
+    """
+
+    def __init__(self, path, scanner=None):
+        self.tailer = LogTailer(path)
+        self.scanner = scanner or LogScanner()
+        self.events = []
+        self._session_offset = 0
+        self._generation = self.tailer.generation
+
+    @property
+    def path(self):
+        return self.tailer.path
+
+    def begin_session(self):
+        """Forget everything logged so far; call this just before (re)starting the app."""
+        self.tailer.seek_to_end()
+        self.events = []
+        self._session_offset = self.tailer.offset
+        self._generation = self.tailer.generation
+
+    def session_offset(self):
+        """Return the offset in the current log file at which this app session starts."""
+        self.tailer.check_rotation()
+        self._sync_generation()
+        return self._session_offset
+
+    def session_started(self):
+        """Return True once the current app session has written to the log."""
+        self.poll()
+        return self.tailer.offset > self._session_offset
+
+    def poll(self):
+        """Scan lines appended since the last poll and return the new events."""
+        lines = self.tailer.read_lines()
+        self._sync_generation()
+        new_events = list(self.scanner.scan(lines))
+        self.events.extend(new_events)
+        return new_events
+
+    def _sync_generation(self):
+        if self.tailer.generation != self._generation:
+            # The log was truncated or replaced, so everything seen so far is from a previous session
+            self.events = []
+            self._session_offset = 0
+            self._generation = self.tailer.generation
+
+    def latest(self, event_type):
+        """Return the most recent event of the given type, or None."""
+        self.poll()
+        for event in reversed(self.events):
+            if event.type == event_type:
+                return event
+        return None
+
+
+_URL_PATTERN_BYTES = re.compile(URL_PREFIX.encode() + rb'(https?://\S+)')
+
+
+def iter_urls_reversed(path, start_offset=0):
+    """Yield auth/logout URLs from the log, most recent first, stopping at start_offset.
+
+    The file is memory-mapped and searched backwards in blocks, so finding the latest URL
+    costs time proportional to its distance from the end of the file rather than the size
+    of the log, and nothing before it is copied into Python strings.
+    """
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > start_offset:
+                # Extend the block back to the start of a line so matches never straddle blocks
+                start = mm.rfind(b'\n', 0, max(0, end - REVERSE_BLOCK_SIZE)) + 1
+                start = max(start, start_offset)
+                urls = [match.group(1) for match in _URL_PATTERN_BYTES.finditer(mm, start, end)]
+                for url in reversed(urls):
+                    yield url.decode('utf-8', errors='ignore')
+                end = start
+
+
+class _PollingBackend:
+    """Waits for the log to change by polling its size, backing off while it stays idle."""
+
+    def __init__(self, tailer):
+        self.tailer = tailer
+
+    def wait(self, timeout):
+        """Block until the file size differs from what the tailer has read, or timeout."""
+        deadline = time.monotonic() + timeout
+        interval = MIN_POLL_INTERVAL
+        while True:
+            try:
+                if os.stat(self.tailer.path).st_size != self.tailer.offset:
+                    return True
+            except OSError:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """Waits for the log to change using inotify on its directory (Linux only)."""
+
+    IN_MODIFY = 0x002
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, tailer):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.name = os.path.basename(tailer.path).encode()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # Watch the directory rather than the file so a recreated log is picked up too
+        directory = os.path.dirname(os.path.abspath(tailer.path))
+        mask = self.IN_MODIFY | self.IN_CREATE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout):
+        """Block until the log is written to, or timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if readable and self._log_changed(os.read(self.fd, 64 * 1024)):
+                return True
+
+    def _log_changed(self, data):
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            _, _, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name == self.name:
+                return True
+        return False
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogWatcher:
+    """Wakes up as soon as Unity writes to the log, instead of sleeping between polls.
+
+    Uses inotify on Linux and falls back to tight adaptive polling elsewhere (or when the
+    log directory doesn't exist yet).
+    """
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self._backend = None
+        if sys.platform.startswith('linux'):
+            try:
+                self._backend = _InotifyBackend(monitor.tailer)
+            except (OSError, AttributeError):
+                pass
+        if self._backend is None:
+            self._backend = _PollingBackend(monitor.tailer)
+
+    def wait_until(self, condition, timeout):
+        """Block until condition() returns something truthy, re-checking whenever the log changes.
+
+        Returns the condition's result, or None on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            result = condition()
+            if result:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._backend.wait(remaining)
+
+    def wait_for(self, event_type, timeout):
+        """Block until an event of the given type has been seen. Returns the event, or None on timeout."""
+        return self.wait_until(lambda: self.monitor.latest(event_type), timeout)
+
+    def close(self):
+        self._backend.close()
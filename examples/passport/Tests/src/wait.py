@@ -0,0 +1,120 @@
+"""
+Condition-based waits for the UI tests.
+
+Instead of sleeping for a fixed time and hoping the app is ready, poll a predicate with a
+deadline and return as soon as it holds. Polling starts fast and backs off (with jitter) so
+slow conditions aren't hammered.
+"""
+
+import os
+import random
+import socket
+import time
+import urllib.request
+
+from unity_log import LogTailer
+
+
+# Where the AltTester server listens; matches the ALTSERVER_* settings used when building the app
+ALTSERVER_HOST = os.getenv("ALTSERVER_HOST", "127.0.0.1")
+ALTSERVER_PORT = int(os.getenv("ALTSERVER_PORT", "13000"))
+
+
+class WaitTimeout(TimeoutError):
+    """Raised when a condition doesn't hold before the deadline."""
+
+
+def wait_until(predicate, timeout=30, interval=0.1, max_interval=2, backoff=1.5, jitter=0.1,
+               ignored_exceptions=(), description=None):
+    """Poll predicate until it returns something truthy, and return that value.
+
+    The delay between polls starts at `interval` and grows by `backoff` up to `max_interval`,
+    randomised by +/- `jitter`. Exceptions listed in `ignored_exceptions` count as "not yet".
+    Raises WaitTimeout if the condition doesn't hold within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    delay = interval
+    while True:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except ignored_exceptions:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaitTimeout(f"Timed out after {timeout}s waiting for {description or predicate}")
+        time.sleep(min(remaining, delay * random.uniform(1 - jitter, 1 + jitter)))
+        delay = min(delay * backoff, max_interval)
+
+
+def wait_for_app_ready(log_ready=None, host=ALTSERVER_HOST, port=ALTSERVER_PORT, timeout=60, log_grace=5):
+    """Block until the AltTester server port accepts connections and, if given, log_ready() holds.
+
+    Call this straight after launching the app. The server port may already be open when
+    AltTester Desktop hosts the server, so pass a log_ready predicate (e.g. "the new app
+    session has written to Player.log") to know the app itself is up. Both are polled with
+    sub-second granularity. If the log shows nothing within `log_grace` seconds of the port
+    opening (e.g. it is being written somewhere else), the open port is taken as ready.
+    Returns the measured cold-start time in seconds.
+    """
+    start = time.monotonic()
+    wait_until(port_open(host, port), timeout=timeout, interval=0.05, max_interval=0.25,
+               description=f"AltTester server on {host}:{port}")
+    if log_ready:
+        remaining = max(0, timeout - (time.monotonic() - start))
+        try:
+            wait_until(log_ready, timeout=min(log_grace, remaining), interval=0.05, max_interval=0.25,
+                       description="app to write to its log")
+        except WaitTimeout:
+            print(f"App log showed nothing {log_grace}s after the AltTester port opened, going by the port alone")
+    return time.monotonic() - start
+
+
+# Predicates. Each returns a callable suitable for wait_until.
+
+def text_changed(alt_object, previous):
+    """The AltTester object's text differs from `previous` and isn't an in-progress message.
+
+    The sample app shows messages like "Sending transaction..." while a call is running, so
+    text ending in "..." doesn't count as a result. Returns the new text.
+    """
+    def predicate():
+        text = alt_object.get_text()
+        if text != previous and not text.endswith("..."):
+            return text
+        return None
+    return predicate
+
+
+def scene_is(altdriver, scene_name):
+    """The app's current scene is `scene_name`."""
+    return lambda: altdriver.get_current_scene() == scene_name
+
+
+def file_contains(path, text):
+    """`text` has been written to the file at `path`. Only new lines are read on each poll."""
+    tailer = LogTailer(path)
+    return lambda: any(text in line for line in tailer.read_lines())
+
+
+def http_ok(url, timeout=2):
+    """A GET request to `url` succeeds with a 2xx status. Returns the response body."""
+    def predicate():
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                return response.read() or True
+        except OSError:
+            return None
+    return predicate
+
+
+def port_open(host, port, timeout=0.5):
+    """A TCP connection to host:port is accepted."""
+    def predicate():
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+    return predicate
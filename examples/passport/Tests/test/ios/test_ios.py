@@ -15,7 +15,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(PROJECT_ROOT / "test"))
 sys.path.insert(0, str(PROJECT_ROOT / "src"))
 from test import TestConfig, UnityTest
-from fetch_otp import fetch_code
+from fetch_otp import start_otp_wait
 
 @pytest.mark.usefixtures('setWebdriver')
 class TestIos:
@@ -51,11 +51,11 @@ class TestIos:
 
                 email_field.send_keys(TestConfig.EMAIL)
                 submit_button = driver.find_element(by=AppiumBy.XPATH, value="//form/div/div/div[2]/button")
+                # Start waiting for the OTP email before submitting, so it's picked up as soon as it lands
+                otp = start_otp_wait()
                 submit_button.click()
 
-                time.sleep(10) # Wait for OTP
-
-                code = fetch_code()
+                code = otp.result()
                 assert code, "Failed to fetch OTP from MailSlurp"
                 print(f"Successfully fetched OTP: {code}")
 
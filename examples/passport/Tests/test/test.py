@@ -1,11 +1,16 @@
+import sys
 import time
 import unittest
 import requests
 import re
 import pytest
+from pathlib import Path
 
 from alttester import *
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from wait import text_changed, wait_until
+
 class TestConfig:
     EMAIL = "unity-sdk@mailslurp.net"
     PASSPORT_ID="email|67480492219c150aceeb1f37"
@@ -36,6 +41,32 @@ class UnityTest(unittest.TestCase):
         if self.__class__.altdriver:
             self.__class__.altdriver.stop()
 
+    def tap_and_wait_for_output(self, button_name, pattern=None, timeout=30):
+        """Tap a button and wait for the Output text to change to a settled result.
+
+        The Output text is read before the tap, then polled until it differs (ignoring
+        in-progress messages ending in "...") and, if given, matches the regex pattern.
+        Returns the text and how long it took to appear, in seconds.
+        """
+        output = self.altdriver.find_object(By.NAME, "Output")
+        previous = output.get_text()
+        changed = text_changed(output, previous)
+        regex = re.compile(pattern) if pattern else None
+
+        def settled():
+            text = changed()
+            if text and (regex is None or regex.search(text)):
+                return text
+            return None
+
+        start = time.monotonic()
+        self.altdriver.wait_for_object(By.NAME, button_name).tap()
+        text = wait_until(settled, timeout=timeout, interval=0.05, max_interval=1,
+                          description=f"{button_name} output")
+        latency = time.monotonic() - start
+        print(f"{button_name} output after {latency:.2f}s: {text}")
+        return text, latency
+
     @pytest.mark.skip(reason="Base test should not be executed directly")
     def test_0_other_functions(self):
         # Show set call timeout scene
@@ -44,10 +75,7 @@ class UnityTest(unittest.TestCase):
 
         milliseconds = self.altdriver.wait_for_object(By.NAME, "MsInput")
         milliseconds.set_text("600000")
-        self.altdriver.find_object(By.NAME, "SetButton").tap()
-        output = self.altdriver.find_object(By.NAME, "Output")
-        text = output.get_text()
-        print(f"CallTimeout output: {text}")
+        text, _ = self.tap_and_wait_for_output("SetButton", timeout=10)
         self.assertEqual("Set call timeout to: 600000ms", text)
 
         # Go back to authenticated scene
@@ -56,52 +84,34 @@ class UnityTest(unittest.TestCase):
 
     @pytest.mark.skip(reason="Base test should not be executed directly")
     def test_1_passport_functions(self):
-        output = self.altdriver.find_object(By.NAME, "Output")
-
         # Get access token
-        self.altdriver.find_object(By.NAME, "GetAccessTokenBtn").tap()
-        text = output.get_text()
+        text, _ = self.tap_and_wait_for_output("GetAccessTokenBtn", timeout=10)
         self.assertTrue(len(text) > 50)
 
         # Get ID token
-        self.altdriver.find_object(By.NAME, "GetIdTokenBtn").tap()
-        text = output.get_text()
+        text, _ = self.tap_and_wait_for_output("GetIdTokenBtn", timeout=10)
         self.assertTrue(len(text) > 50)
 
         # Get email
-        self.altdriver.find_object(By.NAME, "GetEmail").tap()
-        text = output.get_text()
-        print(f"GetEmail output: {text}")
+        text, _ = self.tap_and_wait_for_output("GetEmail", timeout=10)
         self.assertEqual(TestConfig.EMAIL, text)
 
         # Get Passport ID
-        self.altdriver.find_object(By.NAME, "GetPassportId").tap()
-        text = output.get_text()
-        print(f"GetPassportId output: {text}")
+        text, _ = self.tap_and_wait_for_output("GetPassportId", timeout=10)
         self.assertEqual(TestConfig.PASSPORT_ID, text)
 
         # Get linked addresses
-        self.altdriver.find_object(By.NAME, "GetLinkedAddresses").tap()
-        time.sleep(1)
-        text = output.get_text()
-        print(f"GetLinkedAddresses output: {text}")
+        text, _ = self.tap_and_wait_for_output("GetLinkedAddresses", timeout=10)
         self.assertEqual("No linked addresses", text)
 
     @pytest.mark.skip(reason="Base test should not be executed directly")
     def test_3_zkevm_functions(self):
-        output = self.altdriver.find_object(By.NAME, "Output")
-
         # Connect to zkEVM
-        self.altdriver.find_object(By.NAME, "ConnectEvmBtn").tap()
-        text = output.get_text()
-        print(f"ConnectEvmBtn output: {text}")
+        text, _ = self.tap_and_wait_for_output("ConnectEvmBtn")
         self.assertEqual("Connected to EVM", text)
 
         # Initiliase wallet and get address
-        self.altdriver.wait_for_object(By.NAME, "RequestAccountsBtn").tap()
-        time.sleep(5)
-        text = output.get_text()
-        print(f"RequestAccountsBtn output: {text}")
+        text, _ = self.tap_and_wait_for_output("RequestAccountsBtn")
         self.assertEqual(TestConfig.WALLET_ADDRESS, text)
 
         # Show get balance scene
@@ -111,11 +121,7 @@ class UnityTest(unittest.TestCase):
         # Get balance of account
         address = self.altdriver.wait_for_object(By.NAME, "AddressInput")
         address.set_text(TestConfig.WALLET_ADDRESS)
-        self.altdriver.find_object(By.NAME, "GetBalanceButton").tap()
-        time.sleep(2)
-        output = self.altdriver.find_object(By.NAME, "Output")
-        text = output.get_text()
-        print(f"Get balance output: {text}")
+        text, _ = self.tap_and_wait_for_output("GetBalanceButton")
         self.assertRegex(text, r"Balance:\nHex: 0x[0-9a-fA-F]+\nDec: \d+")
 
         # Go back to authenticated scene
@@ -125,7 +131,6 @@ class UnityTest(unittest.TestCase):
         # Show send transaction scene
         self.altdriver.find_object(By.NAME, "SendTransactionBtn").tap()
         self.altdriver.wait_for_current_scene_to_be("ZkEvmSendTransaction")
-        output = self.altdriver.find_object(By.NAME, "Output")
 
         # Send transaction with confirmation
         to = self.altdriver.wait_for_object(By.NAME, "ToInput")
@@ -134,34 +139,25 @@ class UnityTest(unittest.TestCase):
         amount.set_text("0")
         data = self.altdriver.wait_for_object(By.NAME, "DataInput")
         data.set_text("0x1e957f1e")
-        self.altdriver.find_object(By.NAME, "SendButton").tap()
-        time.sleep(15)
-        text = output.get_text()
-        print(f"Send transaction with confirmation output: {text}")
+        text, _ = self.tap_and_wait_for_output("SendButton", timeout=60)
         self.assertTrue(text.startswith("Transaction hash"))
         self.assertTrue(text.endswith("Status: Success"))
         time.sleep(20)
 
         # Send transaction without confirmation and get transaction receipt
         self.altdriver.wait_for_object(By.NAME, "WithConfirmationToggle").tap()
-        self.altdriver.find_object(By.NAME, "SendButton").tap()
-        time.sleep(20)
-        text = output.get_text()
-        print(f"Send transaction without confirmation and get transaction receipt output: {text}")
+        text, _ = self.tap_and_wait_for_output("SendButton", timeout=60)
         self.assertTrue(text.startswith("Transaction hash"))
         self.assertTrue(text.endswith("Status: Success"))
         time.sleep(20)
 
         # Send transaction without confirmation and don't get transaction receipt
         self.altdriver.wait_for_object(By.NAME, "GetTransactionReceiptToggle").tap()
-        self.altdriver.find_object(By.NAME, "SendButton").tap()
-        time.sleep(15)
-        text = output.get_text()
-        print(f"Send transaction without confirmation and don't get transaction receipt output: {text}")
+        text, _ = self.tap_and_wait_for_output("SendButton", timeout=60)
         self.assertTrue(text.startswith("Transaction hash"))
 
         # Grab the transaction hash
-        match = re.search(r"0x[0-9a-fA-F]+", output.get_text())
+        match = re.search(r"0x[0-9a-fA-F]+", text)
         transactionHash = ""
         if match:
             transactionHash = match.group()
@@ -179,13 +175,9 @@ class UnityTest(unittest.TestCase):
         # Get transaction receipt
         hash = self.altdriver.wait_for_object(By.NAME, "HashInput")
         hash.set_text(transactionHash)
-        self.altdriver.find_object(By.NAME, "GetReceiptButton").tap()
-        time.sleep(2)
-        output = self.altdriver.find_object(By.NAME, "Output")
-        text = output.get_text()
-        print(f"Get transaction receipt output: {text}")
+        text, _ = self.tap_and_wait_for_output("GetReceiptButton")
         self.assertEqual("Status: Success", text)
 
         # Go back to authenticated scene
         self.altdriver.find_object(By.NAME, "CancelButton").tap()
-        self.altdriver.wait_for_current_scene_to_be("AuthenticatedScene")
\ No newline at end of file
+        self.altdriver.wait_for_current_scene_to_be("AuthenticatedScene")
@@ -13,7 +13,7 @@ from alttester import *
 from test import TestConfig, UnityTest
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
-from fetch_otp import EMAIL, fetch_code
+from fetch_otp import EMAIL, start_otp_wait
 
 # To run this test on an actual Android device: appium --base-path /wd/hub --allow-insecure chromedriver_autodownload
 class TestBase(UnityTest):
@@ -54,11 +54,11 @@ class TestBase(UnityTest):
         email_field = driver.find_element(by=AppiumBy.XPATH, value="//input[@name=\"address\"]")
         email_field.send_keys(EMAIL)
         submit_button = driver.find_element(by=AppiumBy.XPATH, value="//form/div/div/div[2]/button")
+        # Start waiting for the OTP email before submitting, so it's picked up as soon as it lands
+        otp = start_otp_wait()
         submit_button.click()
 
-        time.sleep(10) # Wait for OTP
-
-        code = fetch_code()
+        code = otp.result()
         if code:
             print(f"Successfully fetched OTP: {code}")
         else:
@@ -0,0 +1,168 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from cdp import CDPClient, CDPError
+
+class FakeDevTools:
+    """A local websocket endpoint speaking just enough RFC 6455 and CDP to exercise CDPClient.
+
+    handler(message) returns the frames to send back, as a list of (opcode, fin, payload)."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.received = []
+        self.pongs = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", 0), self._loop).result(5)
+        self.url = f"ws://127.0.0.1:{self._server.sockets[0].getsockname()[1]}/devtools/browser/fake"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader, writer):
+        request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        key = next(line.split(":", 1)[1].strip() for line in request.split("\r\n")
+                   if line.lower().startswith("sec-websocket-key"))
+        accept = base64.b64encode(hashlib.sha1(key.encode() + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        try:
+            while True:
+                opcode, payload = await self._read_frame(reader)
+                if opcode == 0x8:
+                    break
+                if opcode == 0xA:
+                    self.pongs.append(payload)
+                    continue
+                message = json.loads(payload)
+                self.received.append(message)
+                for frame_opcode, fin, data in self.handler(message):
+                    if frame_opcode is None:
+                        writer.close()
+                        return
+                    writer.write(self._frame(frame_opcode, fin, data))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+
+    @staticmethod
+    async def _read_frame(reader):
+        first, second = await reader.readexactly(2)
+        # Clients must mask every frame
+        assert second & 0x80, "client frame is not masked"
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", await reader.readexactly(8))
+        mask = await reader.readexactly(4)
+        data = await reader.readexactly(length)
+        return first & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+    @staticmethod
+    def _frame(opcode, fin, data):
+        if isinstance(data, str):
+            data = data.encode()
+        length = len(data)
+        if length < 126:
+            header = struct.pack("!BB", (0x80 if fin else 0) | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", (0x80 if fin else 0) | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", (0x80 if fin else 0) | opcode, 127, length)
+        return header + data
+
+def reply(message, result=None):
+    return (0x1, True, json.dumps({"id": message["id"], "result": result or {}}))
+
+class CDPClientTest(unittest.TestCase):
+
+    def serve(self, handler):
+        server = FakeDevTools(handler)
+        self.addCleanup(server.stop)
+        client = CDPClient(server.url, timeout=5)
+        self.addCleanup(client.close)
+        return server, client
+
+    def test_round_trip_with_session(self):
+        server, client = self.serve(lambda message: [reply(message, {"echo": message["params"]})])
+        self.assertEqual(client.send("Test.echo", {"a": 1}, session_id="S1"), {"echo": {"a": 1}})
+        self.assertEqual(server.received[0]["method"], "Test.echo")
+        self.assertEqual(server.received[0]["sessionId"], "S1")
+
+    def test_large_messages_both_ways(self):
+        # Exercises the 16 and 64 bit length encodings
+        for size in (200, 70000):
+            server, client = self.serve(lambda message: [reply(message, {"data": message["params"]["data"]})])
+            self.assertEqual(len(client.send("Test.echo", {"data": "x" * size})["data"]), size)
+
+    def test_fragmented_message_with_interleaved_ping(self):
+        def handler(message):
+            text = json.dumps({"id": message["id"], "result": {"value": "fragmented"}})
+            return [(0x1, False, text[:10]), (0x9, True, b"ping"), (0x0, False, text[10:20]), (0x0, True, text[20:])]
+        server, client = self.serve(handler)
+        self.assertEqual(client.send("Test.fragments"), {"value": "fragmented"})
+        # The pong is written before the reply is returned, but may still be on its way
+        deadline = time.monotonic() + 5
+        while not server.pongs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(server.pongs, [b"ping"])
+
+    def test_error_response_raises(self):
+        server, client = self.serve(lambda message: [
+            (0x1, True, json.dumps({"id": message["id"], "error": {"code": -32601, "message": "not found"}}))])
+        with self.assertRaisesRegex(CDPError, "not found"):
+            client.send("Test.missing")
+
+    def test_events_are_dispatched_before_the_response(self):
+        def handler(message):
+            event = json.dumps({"method": "Test.happened", "params": {"n": 1}, "sessionId": "S1"})
+            return [(0x1, True, event), reply(message)]
+        server, client = self.serve(handler)
+        event = client.expect_event("Test.happened", session_id="S1")
+        client.send("Test.trigger")
+        self.assertEqual(event.result(5), {"n": 1})
+
+    def test_lost_connection_fails_pending_command(self):
+        server, client = self.serve(lambda message: [(None, True, b"")])
+        with self.assertRaisesRegex(CDPError, "connection lost"):
+            client.send("Test.hangup", timeout=5)
+        self.assertTrue(client.closed)
+
+    def test_page_url_comes_from_target_info(self):
+        def handler(message):
+            if message["method"] == "Target.attachToTarget":
+                return [reply(message, {"sessionId": "S1"})]
+            if message["method"] == "Target.getTargetInfo":
+                return [reply(message, {"targetInfo": {"targetId": "T1", "url": "https://auth.immutable.com/",
+                                                       "title": "Login"}})]
+            return [reply(message)]
+        server, client = self.serve(handler)
+        page = client.attach("T1")
+        self.assertEqual((page.url, page.title), ("https://auth.immutable.com/", "Login"))
+        self.assertNotIn("Runtime.evaluate", [message["method"] for message in server.received])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,6 @@ import os
 import subprocess
 from pathlib import Path
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By as SeleniumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,73 +16,59 @@ from test import TestConfig, UnityTest
 from test_mac_helpers import open_sample_app, bring_sample_app_to_foreground, stop_sample_app
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
-from fetch_otp import fetch_code
+from browser_cache import cache_args
+from browser_profile import CLEAN_EXIT_PREFS, prepare_profile
+from browser_session import WebDriverSessionManager
+from devtools import BROWSER_POOL, devtools_available, reset_browser, wait_for_devtools
+from fetch_otp import start_otp_wait
+from processes import find_pids, stop_processes, wait_for_exit
 
 class MacTest(UnityTest):
 
     altdriver = None
+    browser_sessions = None
 
     @classmethod
     def setUpClass(cls):
         open_sample_app()
         cls.altdriver = AltDriver()
-        cls.stop_browser()
+        cls.stop_browser(force=True)
 
     @classmethod
     def tearDownClass(cls):
         stop_sample_app()
         cls.altdriver.stop()
-        cls.stop_browser()
+        if cls.browser_sessions:
+            cls.browser_sessions.shutdown()
+        cls.stop_browser(force=True)
 
     @classmethod
     def ensure_browser_clean(cls):
         """Kill any running Brave instance and delete session restore files.
         Call this before any action that may open the browser (login, logout, etc.)
         so Brave always starts with a clean slate."""
-        result = subprocess.run(["pgrep", "-f", "Brave Browser"], capture_output=True, text=True)
-        if result.returncode == 0:
+        if find_pids("Brave Browser"):
             print("Brave Browser already running, stopping it...")
-            subprocess.run(["osascript", "-e", 'tell application "Brave Browser" to quit'],
-                           check=False, capture_output=True, timeout=5)
-            time.sleep(2)
-            subprocess.run(["pkill", "-f", "Brave Browser"], check=False, capture_output=True)
-            time.sleep(2)
+            cls.quit_brave(quit_timeout=2)
             print("Existing Brave Browser stopped")
 
+        # Reset Preferences from the prebuilt template and clear the session restore files
         brave_profile = os.path.expanduser(
             "~/Library/Application Support/BraveSoftware/Brave-Browser/Default"
         )
-
-        # Clear session data (Brave stores sessions in Sessions/ directory)
-        import shutil
-        sessions_dir = os.path.join(brave_profile, "Sessions")
-        if os.path.isdir(sessions_dir):
-            shutil.rmtree(sessions_dir, ignore_errors=True)
-            print("Removed Sessions directory")
-        session_storage_dir = os.path.join(brave_profile, "Session Storage")
-        if os.path.isdir(session_storage_dir):
-            shutil.rmtree(session_storage_dir, ignore_errors=True)
-            print("Removed Session Storage directory")
-
-        # Patch Preferences so Brave thinks it shut down cleanly,
-        # otherwise it forces session restore on "Crashed" exit_type
-        prefs_path = os.path.join(brave_profile, "Preferences")
-        try:
-            if os.path.exists(prefs_path):
-                import json
-                with open(prefs_path, "r") as f:
-                    prefs = json.load(f)
-                prefs.setdefault("profile", {})["exit_type"] = "Normal"
-                prefs["profile"]["exited_cleanly"] = True
-                prefs.setdefault("session", {})["restore_on_startup"] = 5
-                with open(prefs_path, "w") as f:
-                    json.dump(prefs, f)
-                print("Patched Preferences: exit_type=Normal, restore_on_startup=NewTab")
-        except Exception as e:
-            print(f"Could not patch Preferences: {e}")
+        prepare_profile(brave_profile, [CLEAN_EXIT_PREFS])
 
     @classmethod
     def launch_browser(cls):
+        if BROWSER_POOL and devtools_available():
+            # Reuse the warm browser from the previous flow instead of cold-starting a new one
+            print("Reusing pooled Brave Browser...")
+            try:
+                reset_browser()
+                return
+            except Exception as e:
+                print(f"Could not reset pooled browser ({e}), restarting it")
+
         print("Starting Browser...")
         browser_paths = [
             "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
@@ -109,11 +92,13 @@ class MacTest(UnityTest):
             "--no-first-run",
             "--no-default-browser-check",
             "--disable-session-crashed-bubble",
-            "--restore-last-session=false"
+            "--restore-last-session=false",
+            *cache_args()
         ])
 
         print("Waiting for Brave to fully initialize...")
-        time.sleep(10)
+        version, startup_latency = wait_for_devtools(timeout=30)
+        print(f"{version.get('Browser', 'Brave')} DevTools ready after {startup_latency:.2f}s")
 
         # Dismiss any macOS keychain dialog from a previous failed cleanup
         subprocess.run([
@@ -138,62 +123,62 @@ class MacTest(UnityTest):
             print("Continuing anyway...")
 
     @classmethod
-    def stop_browser(cls):
+    def quit_brave(cls, quit_timeout=5):
+        """Quit Brave via AppleScript and wait for all its processes to exit, killing any that
+        are still running after quit_timeout seconds. Returns the number of processes stopped."""
+        pids = find_pids("Brave Browser")
+        if not pids:
+            return 0
+        subprocess.run(["osascript", "-e", 'tell application "Brave Browser" to quit'],
+                       check=False, capture_output=True, timeout=10)
+        if not wait_for_exit(pids, quit_timeout):
+            print("Brave Browser did not quit, killing its processes")
+            stop_processes(pids, timeout=5)
+        return len(pids)
+
+    @classmethod
+    def stop_browser(cls, force=False):
+        """Quit Brave. In browser pool mode it is only reset and kept running, unless force=True."""
+        if BROWSER_POOL and not force:
+            try:
+                reset_browser()
+                print("Kept pooled Brave Browser running")
+                return
+            except Exception as e:
+                print(f"Could not reset pooled browser ({e}), stopping it")
+
         print("Stopping Brave Browser...")
         try:
-            subprocess.run([
-                "osascript", "-e",
-                'tell application "Brave Browser" to quit'
-            ], check=False, capture_output=True, timeout=10)
-            time.sleep(2)
-
-            result = subprocess.run(["pgrep", "-f", "Brave Browser"],
-                                    capture_output=True, text=True)
-            if result.returncode == 0:
-                subprocess.run(["pkill", "-f", "Brave Browser"],
-                               check=False, capture_output=True)
-                print("Killed Brave Browser processes")
-
-            print("Brave Browser has been closed.")
+            start = time.monotonic()
+            if cls.quit_brave():
+                print(f"Brave Browser has been closed after {time.monotonic() - start:.2f}s.")
+            else:
+                print("Brave Browser is not running.")
         except Exception as e:
             print("Brave Browser might not be running.")
 
-        time.sleep(3)
         print("Stopped Brave Browser")
 
     @classmethod
     def login(cls):
         print("Connect to Brave Browser")
-        # Set up Chrome options to connect to the existing Brave instance (Brave uses Chromium engine)
-        chrome_options = Options()
-        chrome_options.add_experimental_option("debuggerAddress", "localhost:9222")
-
-        # Explicitly specify ChromeDriver path and Chrome browser path for macOS
-        from selenium.webdriver.chrome.service import Service
-        chromedriver_path = "/usr/local/bin/chromedriver"
-        
         # Use Brave Browser only for macOS automation
         brave_path = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
         
-        import os
-        browser_path = None
         if os.path.exists(brave_path):
-            browser_path = brave_path
-            print(f"Found Brave at: {browser_path}")
+            print(f"Found Brave at: {brave_path}")
         else:
             print("Brave Browser not found - required for macOS tests")
             raise FileNotFoundError("Brave Browser is required for macOS CI tests")
-        
-        # Set Brave as the browser binary if found
-        if browser_path:
-            chrome_options.binary_location = browser_path
 
-        # Create service with explicit ChromeDriver path and bypass version checking
-        service_args = ["--whitelisted-ips=", "--disable-build-check"]
-        service = Service(executable_path=chromedriver_path, service_args=service_args)
+        if cls.browser_sessions is None:
+            # Started once per suite: explicit ChromeDriver path, bypassing version checking.
+            # Brave uses the Chromium engine, so Chrome WebDriver can attach to it
+            cls.browser_sessions = WebDriverSessionManager("/usr/local/bin/chromedriver", brave_path,
+                                                           service_args=["--whitelisted-ips=", "--disable-build-check"])
 
-        # Connect to the existing Brave instance
-        cls.seleniumdriver = webdriver.Chrome(service=service, options=chrome_options)
+        # Connect to the existing Brave instance, reusing the session from earlier flows
+        cls.seleniumdriver = cls.browser_sessions.driver()
 
         print("Open a window on Brave")
 
@@ -203,16 +188,14 @@ class MacTest(UnityTest):
         email_field = WebDriverWait(cls.seleniumdriver, 60).until(EC.presence_of_element_located((SeleniumBy.ID, ':r1:')))
         print("Entering email...")
         email_field.send_keys(TestConfig.EMAIL)
+        # Start waiting for the OTP email before submitting, so it's picked up as soon as it lands
+        otp = start_otp_wait()
         email_field.send_keys(Keys.RETURN)
 
-        # Wait for OTP
-        print("Waiting for OTP...")
-        time.sleep(10)
-        print("Fetching OTP from MailSlurp...")
-        code = fetch_code()
+        print("Waiting for OTP from MailSlurp...")
+        code = otp.result()
         
         if not code:
-            cls.seleniumdriver.quit()
             raise AssertionError("Failed to fetch OTP from MailSlurp")
         
         print(f"Successfully fetched OTP: {code}")
@@ -224,8 +207,6 @@ class MacTest(UnityTest):
 
         time.sleep(5)
 
-        cls.seleniumdriver.quit()
-
     @classmethod
     def logout(cls):
         print("Logging out...")
@@ -300,7 +281,6 @@ class MacTest(UnityTest):
         # Restart AltTester
         self.altdriver.stop()
         self.__class__.altdriver = AltDriver()
-        time.sleep(5)
 
         # Wait for unauthenticated screen
         self.altdriver.wait_for_current_scene_to_be("UnauthenticatedScene")
@@ -1,39 +1,60 @@
+import plistlib
 import subprocess
+import sys
 import time
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from processes import find_pids, stop_processes
+from unity_log import UnityLogMonitor
+from wait import WaitTimeout, wait_for_app_ready
 
 def get_app_name():
     """Get the app name from environment variable, falling back to default"""
     return os.getenv("UNITY_APP_NAME", "SampleApp")
 
+def get_product_name():
+    """Return the product name Unity logs under, read from the app bundle, falling back to the app name"""
+    app_name = get_app_name()
+    try:
+        with open(os.path.join(f"{app_name}.app", "Contents", "Info.plist"), "rb") as f:
+            return plistlib.load(f).get("CFBundleName") or app_name
+    except (OSError, plistlib.InvalidFileException):
+        return app_name
+
+def get_unity_log_path():
+    """Return the path of the Unity Player.log on macOS"""
+    return os.path.join(os.path.expanduser("~"), "Library", "Logs", "Immutable", get_product_name(), "Player.log")
+
 def open_sample_app():
     app_name = get_app_name()
     print(f"Opening Unity sample app ({app_name})...")
+    # Anything already in the log belongs to the previous run of the app
+    log_monitor = UnityLogMonitor(get_unity_log_path())
+    log_monitor.begin_session()
     subprocess.Popen(["open", f"{app_name}.app"], shell=False)
-    time.sleep(5)
-    print(f"Unity sample app ({app_name}) opened successfully.")
+    try:
+        cold_start = wait_for_app_ready(log_ready=log_monitor.session_started, timeout=30)
+        print(f"Unity sample app ({app_name}) opened successfully (ready after {cold_start:.2f}s).")
+    except WaitTimeout as e:
+        print(f"{e} - continuing anyway")
+        print(f"Unity sample app ({app_name}) opened.")
 
 def stop_sample_app():
     app_name = get_app_name()
     print(f"Stopping sample app ({app_name})...")
 
-    bash_script = f"""
-    app_path="{app_name}.app"
-    echo "Closing sample app..."
-    PID=$(ps aux | grep "$app_path" | grep -v grep | awk '{{print $2}}')
-    if [ -n "$PID" ]; then
-        kill $PID
-        echo "Sample app (PID $PID) has been terminated."
-    else
-        echo "Sample app is not running."
-    fi
-    echo "Waiting for 5 seconds..."
-    sleep 5
-    """
-
-    subprocess.run(bash_script, shell=True, check=True, text=True)
-
-    time.sleep(5)
+    pids = find_pids(f"{app_name}.app")
+    if not pids:
+        print("Sample app is not running.")
+        return
+    # SIGTERM, then wait for the app to actually exit rather than a fixed 10 seconds
+    start = time.monotonic()
+    if stop_processes(pids, timeout=10):
+        print(f"Sample app (PID {' '.join(map(str, pids))}) has been terminated after {time.monotonic() - start:.2f}s.")
+    else:
+        print("Sample app may still be running.")
     print(f"Stopped sample app ({app_name}).")
 
 def bring_sample_app_to_foreground():
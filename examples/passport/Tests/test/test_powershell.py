@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import textwrap
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from powershell import PowerShellError, PowerShellSession, PowerShellTimeout, encode_request, parse_response
+
+# Speaks the host protocol without PowerShell. A "script" is a command for the fake:
+# "echo <text>", "exit <status> <text>", "sleep <seconds>" or "die"
+FAKE_HOST = textwrap.dedent('''
+    import base64, sys, time
+    print("Windows PowerShell banner", flush=True)
+    for line in sys.stdin:
+        tag, request_id, payload = line.split(" ")
+        command, _, argument = base64.b64decode(payload).decode("utf-8").partition(" ")
+        status, output = 0, ""
+        if command == "echo":
+            output = argument
+        elif command == "exit":
+            status, _, output = argument.partition(" ")
+        elif command == "sleep":
+            time.sleep(float(argument))
+        elif command == "die":
+            sys.exit(3)
+        print("stray console output", flush=True)
+        encoded = base64.b64encode(output.encode("utf-8")).decode("ascii")
+        print(f"RES {request_id} {status} {encoded}", flush=True)
+''')
+
+class ProtocolTest(unittest.TestCase):
+
+    def test_request_round_trips_through_a_response(self):
+        script = "Write-Host 'héllo wörld'\nGet-Process"
+        request_id, payload = encode_request("7", script).split(" ")[1:]
+        self.assertEqual(parse_response(f"RES {request_id} 0 {payload.strip()}\n"), ("7", 0, script))
+
+    def test_non_responses_are_ignored(self):
+        for line in ["Windows PowerShell", "RES 1 0", "RES 1 x aGk=", "RES 1 0 not-base64!", "REQ 1 aGk="]:
+            self.assertIsNone(parse_response(line), line)
+
+class PowerShellSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = PowerShellSession([sys.executable, "-c", FAKE_HOST])
+        self.addCleanup(self.session.close)
+
+    def test_runs_scripts_in_one_process(self):
+        first = self.session.run("echo héllo")
+        pid = self.session._process.pid
+        second = self.session.run("echo again")
+        self.assertEqual((first.returncode, first.stdout), (0, "héllo"))
+        self.assertEqual(second.stdout, "again")
+        self.assertEqual(self.session._process.pid, pid)
+
+    def test_status_is_returned_as_returncode(self):
+        result = self.session.run("exit 1 failed")
+        self.assertIsInstance(result, subprocess.CompletedProcess)
+        self.assertEqual((result.returncode, result.stdout), (1, "failed"))
+
+    def test_timeout_restarts_the_host(self):
+        start = time.monotonic()
+        with self.assertRaises(PowerShellTimeout):
+            self.session.run("sleep 5", timeout=0.5)
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertEqual(self.session.run("echo back").stdout, "back")
+
+    def test_dead_host_raises_and_is_restarted(self):
+        with self.assertRaises(PowerShellError):
+            self.session.run("die")
+        self.assertEqual(self.session.run("echo back").stdout, "back")
+
+if __name__ == '__main__':
+    unittest.main()
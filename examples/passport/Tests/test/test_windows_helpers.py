@@ -18,26 +18,42 @@ SOLUTION:
 This approach enables reliable automated testing of Passport authentication flows.
 """
 
+import concurrent.futures
 import os
 import re
 import subprocess
 import sys
+import tempfile
 import time
+import urllib.parse
 from pathlib import Path
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
-from fetch_otp import EMAIL, fetch_code
+from fetch_otp import EMAIL, start_otp_wait
+from request_filter import RequestFilter
+from login_flow import EMAIL_SELECTORS, REDIRECTED, LoginError, OTPNotReceived, drive_login
+from browser_cache import CacheMonitor, CacheWarmer, cache_args
+from browser_profile import CLEAN_EXIT_PREFS, PROTOCOL_HANDLER_PREFS, prepare_profile
+from devtools import (AUTH_ORIGINS, BROWSER_POOL, PREWARM_AUTH, connect_browser, devtools_available, prewarm_origins,
+                      reset_browser, wait_for_devtools)
+from powershell import run_powershell
+from processes import ProcessSupervisor, find_pids, stop_processes
+from stats_store import TIMINGS_PATH, StatsStore
+from wait import WaitTimeout, wait_for_app_ready
+from unity_log import AUTH_URL, ERROR, LOGIN_SUCCESS, LOGOUT_URL, LogWatcher, UnityLogMonitor, iter_urls_reversed
 
 # Add chrome.exe to environment variable
-# Download chrome driver and add to environment variable
+
+BRAVE_PATH = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+
+# Processes launched by the tests (the Unity app and the debug browser), so they can be stopped reliably
+supervisor = ProcessSupervisor()
+
+# Fills the persistent browser cache (DISK_CACHE_DIR) in the background while the Unity app starts
+cache_warmer = CacheWarmer(BRAVE_PATH)
+
+# Background tabs opened on the auth origin by launch_browser, which aren't the login tab
+prewarm_targets = []
 
 def get_product_name():
     """Get the product name from ProjectSettings.asset"""
@@ -59,49 +75,55 @@ def get_product_name():
     # If regex fails, return default
     return "SampleApp"
 
-def get_auth_url_from_unity_logs():
-    """Monitor Unity logs to capture the PASSPORT_AUTH_URL."""
-    import tempfile
-    import os
-    
+def get_unity_log_paths():
+    """Return the Unity log file locations on Windows, most likely first."""
     product_name = os.getenv("UNITY_APP_NAME", get_product_name())
-    
-    # Unity log file locations on Windows
-    log_paths = [
+    return [
         os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "Immutable", product_name, "Player.log"),
         os.path.join(tempfile.gettempdir(), "UnityPlayer.log"),
         "Player.log"  # Current directory
     ]
-    
-    for log_path in log_paths:
+
+# One monitor per log path, shared by every consumer so each new chunk is scanned only once
+_unity_log_monitors = {}
+
+def get_unity_log_monitor(log_path):
+    """Return the shared UnityLogMonitor for the given log path."""
+    if log_path not in _unity_log_monitors:
+        _unity_log_monitors[log_path] = UnityLogMonitor(log_path)
+    return _unity_log_monitors[log_path]
+
+def _find_latest_auth_url(log_path, login_only=False):
+    """Search the current app session's log backwards from the end for the most recent login URL."""
+    last_url = None
+    session_offset = get_unity_log_monitor(log_path).session_offset()
+    for url in iter_urls_reversed(log_path, session_offset):
+        if 'im-logged-out' not in url and 'logout' not in url:
+            return url
+        last_url = last_url or url
+    return None if login_only else last_url
+
+def get_auth_url_from_unity_logs(latest=False, login_only=False):
+    """Monitor Unity logs to capture the PASSPORT_AUTH_URL.
+
+    With latest=True the log is searched backwards from the end instead of being followed,
+    which is cheaper when attaching to an app that has already logged its auth URL.
+    With login_only=True a logout URL is never returned."""
+    for log_path in get_unity_log_paths():
         if os.path.exists(log_path):
             print(f"Monitoring Unity log: {log_path}")
-            # Read the log file and look for PASSPORT_AUTH_URL
             try:
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    # Look for either our custom message or the existing LaunchAuthURL message
-                    # Get the LAST occurrence (most recent) and make sure it's a login URL, not logout
-                    # Now includes [Immutable] tag from PassportLogger
-                    matches = re.findall(r'(?:\[Immutable\] PASSPORT_AUTH_URL: |PASSPORT_AUTH_URL: |LaunchAuthURL : )(https?://[^\s]+)', content)
-                    if matches:
-                        # Get the last URL and make sure it's not a logout URL
-                        for url in reversed(matches):
-                            if 'im-logged-out' not in url and 'logout' not in url:
-                                match = type('obj', (object,), {'group': lambda x, n: url if n == 1 else None})()
-                                break
-                        else:
-                            # All URLs were logout URLs, take the last one anyway
-                            if matches:
-                                match = type('obj', (object,), {'group': lambda x, n: matches[-1] if n == 1 else None})()
-                            else:
-                                match = None
-                    else:
-                        match = None
-                    if match:
-                        url = match.group(1)
-                        print(f"Found auth URL in Unity logs: {url}")
-                        return url
+                # Get the most recent login URL. If all URLs were logout URLs, take the last one
+                # anyway, unless only a login URL will do
+                if latest:
+                    url = _find_latest_auth_url(log_path, login_only)
+                else:
+                    monitor = get_unity_log_monitor(log_path)
+                    event = monitor.latest(AUTH_URL) or (None if login_only else monitor.latest(LOGOUT_URL))
+                    url = event.value if event else None
+                if url:
+                    print(f"Found auth URL in Unity logs: {url}")
+                    return url
             except Exception as e:
                 print(f"Error reading log file {log_path}: {e}")
                 continue
@@ -111,33 +133,15 @@ def get_auth_url_from_unity_logs():
 
 def get_logout_url_from_unity_logs():
     """Monitor Unity logs to capture logout URLs."""
-    import tempfile
-    import os
-    
-    product_name = os.getenv("UNITY_APP_NAME", get_product_name())
-    
-    # Unity log file locations on Windows
-    log_paths = [
-        os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "Immutable", product_name, "Player.log"),
-        os.path.join(tempfile.gettempdir(), "UnityPlayer.log"),
-        "Player.log"  # Current directory
-    ]
-    
-    for log_path in log_paths:
+    for log_path in get_unity_log_paths():
         if os.path.exists(log_path):
             print(f"Monitoring Unity log for logout URL: {log_path}")
             try:
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    # Look for logout URLs in Unity logs (uses same PASSPORT_AUTH_URL pattern)
-                    # Now includes [Immutable] tag from PassportLogger
-                    matches = re.findall(r'(?:\[Immutable\] PASSPORT_AUTH_URL: |PASSPORT_AUTH_URL: |LaunchAuthURL : )(https?://[^\s]+)', content)
-                    if matches:
-                        # Get the last URL and make sure it's a logout URL
-                        for url in reversed(matches):
-                            if 'logout' in url or 'im-logged-out' in url:
-                                print(f"Found logout URL: {url}")
-                                return url
+                # Logout URLs use the same PASSPORT_AUTH_URL pattern
+                event = get_unity_log_monitor(log_path).latest(LOGOUT_URL)
+                if event:
+                    print(f"Found logout URL: {event.value}")
+                    return event.value
             except Exception as e:
                 print(f"Error reading log file {log_path}: {e}")
                 continue
@@ -145,52 +149,68 @@ def get_logout_url_from_unity_logs():
     print("No logout URL found in Unity logs")
     return None
 
+def get_unity_log_path():
+    """Return the first Unity log that exists, falling back to the usual Player.log location."""
+    log_paths = get_unity_log_paths()
+    return next((log_path for log_path in log_paths if os.path.exists(log_path)), log_paths[0])
+
+# One watcher per log path, wrapping the shared monitor
+_unity_log_watchers = {}
+
+def get_unity_log_watcher(log_path):
+    """Return the shared LogWatcher for the given log path."""
+    if log_path not in _unity_log_watchers:
+        _unity_log_watchers[log_path] = LogWatcher(get_unity_log_monitor(log_path))
+    return _unity_log_watchers[log_path]
+
+def wait_for_unity_log_event(event_type, timeout=30, log_path=None):
+    """Block until an event of the given type shows up in the Unity log. Returns the event or None.
+
+    Wakes up as soon as the log is written to rather than polling once a second."""
+    return get_unity_log_watcher(log_path or get_unity_log_path()).wait_for(event_type, timeout)
+
+def begin_unity_log_session():
+    """Forget anything already in the Unity logs, so stale URLs from a previous run of the app are never returned."""
+    for log_path in get_unity_log_paths():
+        get_unity_log_monitor(log_path).begin_session()
+
+def attach_controlled_page(browser):
+    """Attach to the first open tab that isn't a background prewarm tab, opening one if there is none."""
+    for target in browser.pages():
+        if target["targetId"] not in prewarm_targets:
+            return browser.attach(target["targetId"])
+    return browser.new_page()
+
 def logout_with_controlled_browser():
     """Handle logout using the controlled browser instance instead of letting Unity open its own browser."""
     print("Starting controlled logout process...")
     
-    # Set up Chrome WebDriver options to connect to the existing browser instance
-    chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", "localhost:9222")
-    
     try:
-        # Connect to the existing browser instance with explicit paths
-        from selenium.webdriver.chrome.service import Service
-        chromedriver_path = r"C:\Users\WindowsBuildsdkServi\Development\chromedriver-win64\chromedriver-win64\chromedriver.exe"
-        brave_path = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-        
-        # Set Brave as the browser binary
-        chrome_options.binary_location = brave_path
-        
-        # Create service with explicit ChromeDriver path
-        service = Service(executable_path=chromedriver_path)
-            
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        print("Connected to existing browser for logout")
-        
-        # Monitor Unity logs for logout URL
-        print("Monitoring Unity logs for logout URL...")
-        logout_url = None
-        for attempt in range(15):  # Try for 15 seconds (shorter timeout)
-            logout_url = get_logout_url_from_unity_logs()
-            if logout_url:
-                break
-            time.sleep(1)
-        
-        if logout_url:
-            print(f"Navigating controlled browser to logout URL: {logout_url}")
-            driver.get(logout_url)
-            
-            # Wait for logout to complete (protocol is already configured, no dialogs expected)
-            time.sleep(3)
-            print("Logout completed in controlled browser")
+        # Talk to the existing browser instance directly over its DevTools websocket
+        with connect_browser() as browser:
+            page = attach_controlled_page(browser)
+            print("Connected to existing browser for logout")
             
-            # Check final page
-            current_url = driver.current_url
-            print(f"Final logout URL: {current_url}")
+            # Monitor Unity logs for logout URL
+            print("Monitoring Unity logs for logout URL...")
+            logout_event = wait_for_unity_log_event(LOGOUT_URL, timeout=15)  # Shorter timeout
             
-        else:
-            print("Could not find logout URL in Unity logs - logout may complete without browser interaction")
+            if logout_event:
+                logout_url = logout_event.value
+                print(f"Found logout URL: {logout_url}")
+                print(f"Navigating controlled browser to logout URL: {logout_url}")
+                page.navigate(logout_url)
+                
+                # Wait for logout to complete (protocol is already configured, no dialogs expected)
+                time.sleep(3)
+                print("Logout completed in controlled browser")
+                
+                # Check final page
+                current_url = page.url
+                print(f"Final logout URL: {current_url}")
+                
+            else:
+                print("Could not find logout URL in Unity logs - logout may complete without browser interaction")
         
     except Exception as e:
         print(f"Error during controlled logout: {e}")
@@ -198,11 +218,11 @@ def logout_with_controlled_browser():
     
     print("Controlled logout process completed")
 
-def handle_cached_authentication(driver):
+def handle_cached_authentication(page):
     """Handle scenarios where user is already authenticated (cached session)"""
     print("Handling cached authentication scenario...")
-    print(f"Current URL: {driver.current_url}")
-    print(f"Page title: {driver.title}")
+    print(f"Current URL: {page.url}")
+    print(f"Page title: {page.title}")
     
     # Give a moment for any page transitions to complete
     time.sleep(3)
@@ -214,27 +234,12 @@ def handle_cached_authentication(driver):
         print("CI environment - checking if authentication completed automatically")
         print("Monitoring Unity logs for authentication completion...")
         
-        product_name = os.getenv("UNITY_APP_NAME", get_product_name())
-        log_path = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "Immutable", product_name, "Player.log")
+        log_path = get_unity_log_paths()[0]
         
-        auth_success = False
-        for check_attempt in range(30):  # Check for 30 seconds
-            try:
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    # Look for signs of successful authentication
-                    if any(phrase in content for phrase in [
-                        "AuthenticatedScene", 
-                        "authentication successful", 
-                        "logged in successfully",
-                        "Passport token received"
-                    ]):
-                        print("Authentication success detected in Unity logs!")
-                        auth_success = True
-                        break
-            except:
-                pass
-            time.sleep(1)
+        # Look for signs of successful authentication (check for 30 seconds)
+        auth_success = wait_for_unity_log_event(LOGIN_SUCCESS, log_path=log_path) is not None
+        if auth_success:
+            print("Authentication success detected in Unity logs!")
         
         if not auth_success:
             print("No authentication success detected - attempting automated dialog handling")
@@ -258,7 +263,7 @@ def handle_cached_authentication(driver):
                                     if ($buttonText -like "*Open*" -or $buttonText -like "*Allow*" -or $buttonText -like "*Yes*") {
                                         $button.GetCurrentPattern([Windows.Automation.InvokePattern]::Pattern).Invoke()
                                         Write-Host "Clicked protocol dialog button: $buttonText"
-                                        exit 0
+                                        return
                                     }
                                 }
                             }
@@ -269,8 +274,7 @@ def handle_cached_authentication(driver):
                 Write-Host "No protocol dialog found"
                 '''
                 
-                result = subprocess.run(["powershell", "-Command", ps_script], 
-                                      capture_output=True, text=True, timeout=15)
+                result = run_powershell(ps_script, timeout=15)
                 if "Clicked protocol dialog" in result.stdout:
                     print("Successfully automated protocol dialog click in CI!")
                     # Wait a bit more for Unity to process
@@ -289,102 +293,146 @@ def handle_cached_authentication(driver):
     
     return  # Exit since cached auth is complete
 
-def login():
-    print("Connect to Brave via Chrome WebDriver")
-    # Set up Chrome WebDriver options to connect to the existing Brave instance
-    # (Brave uses Chromium engine so Chrome WebDriver works)
-    chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", "localhost:9222")
-    
-    # Explicitly specify ChromeDriver path and Brave browser path
-    from selenium.webdriver.chrome.service import Service
-    chromedriver_path = r"C:\Users\WindowsBuildsdkServi\Development\chromedriver-win64\chromedriver-win64\chromedriver.exe"
-    brave_path = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-    
-    # Set Brave as the browser binary
-    chrome_options.binary_location = brave_path
-    
-    # Create service with explicit ChromeDriver path
-    service = Service(executable_path=chromedriver_path)
-    
-    # Connect to the existing Brave browser instance
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+# Name of the CDP binding the interceptor calls with the captured callback URL
+CALLBACK_BINDING = "__immutableRunnerCallback"
+
+# Injected into the auth tab to intercept immutablerunner:// redirects.
+# The auth0 "checking" page redirects via JS to immutablerunner://callback?code=...&state=...
+# but Brave blocks it with a native dialog automation cannot click. By intercepting the URL
+# before the navigation fires, we can invoke the deep link directly from the OS. The URL is
+# pushed to the harness through the binding the moment it is captured.
+PROTOCOL_INTERCEPTOR = """
+(function() {
+    if (window.__protocolInterceptorInstalled) return;
+    window.__protocolInterceptorInstalled = true;
+    window.__capturedProtocolUrl = null;
+    function capture(url) {
+        window.__capturedProtocolUrl = url;
+        if (typeof window.__immutableRunnerCallback === 'function') {
+            window.__immutableRunnerCallback(url);
+        }
+    }
+    if (window.navigation) {
+        window.navigation.addEventListener('navigate', function(e) {
+            if (e.destination && e.destination.url &&
+                e.destination.url.startsWith('immutablerunner://')) {
+                capture(e.destination.url);
+                e.preventDefault();
+            }
+        });
+    }
+    try {
+        var origAssign = Location.prototype.assign;
+        Location.prototype.assign = function(url) {
+            if (typeof url === 'string' && url.startsWith('immutablerunner://')) {
+                capture(url);
+                return;
+            }
+            return origAssign.call(this, url);
+        };
+        var origReplace = Location.prototype.replace;
+        Location.prototype.replace = function(url) {
+            if (typeof url === 'string' && url.startsWith('immutablerunner://')) {
+                capture(url);
+                return;
+            }
+            return origReplace.call(this, url);
+        };
+    } catch(e) {}
+})();
+"""
+
+def intercept_protocol_redirects(page):
+    """Install the redirect interceptor on the tab, for the current and all later documents.
 
-    # Inject a script on all future page loads to intercept immutablerunner:// redirects.
-    # The auth0 "checking" page redirects via JS to immutablerunner://callback?code=...&state=...
-    # but Brave blocks it with a native dialog Selenium cannot click. By intercepting the URL
-    # before the navigation fires, we can invoke the deep link directly from the OS.
+    Returns a Future that resolves with the Runtime.bindingCalled params once a callback URL is captured."""
+    page.add_binding(CALLBACK_BINDING)
+    intercepted = page.expect_binding_call(CALLBACK_BINDING)
+    page.add_init_script(PROTOCOL_INTERCEPTOR)
+    return intercepted
+
+def wait_for_callback_url(page, intercepted, timeout=30):
+    """Wait for the interceptor to push the callback URL and return it.
+
+    Returns None if the tab left the auth pages first (the deep link fired natively) or nothing
+    was captured within the timeout."""
+    def left_auth_pages(url):
+        return 'checking' not in url and 'auth.immutable.com' not in url
+
+    navigated_away = page.expect_event(
+        "Page.frameNavigated",
+        lambda params: not params["frame"].get("parentId") and left_auth_pages(params["frame"]["url"]))
     try:
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": """
-                window.__capturedProtocolUrl = null;
-                if (window.navigation) {
-                    window.navigation.addEventListener('navigate', function(e) {
-                        if (e.destination && e.destination.url &&
-                            e.destination.url.startsWith('immutablerunner://')) {
-                            window.__capturedProtocolUrl = e.destination.url;
-                            e.preventDefault();
-                        }
-                    });
-                }
-                try {
-                    var origAssign = Location.prototype.assign;
-                    Location.prototype.assign = function(url) {
-                        if (typeof url === 'string' && url.startsWith('immutablerunner://')) {
-                            window.__capturedProtocolUrl = url;
-                            return;
-                        }
-                        return origAssign.call(this, url);
-                    };
-                    var origReplace = Location.prototype.replace;
-                    Location.prototype.replace = function(url) {
-                        if (typeof url === 'string' && url.startsWith('immutablerunner://')) {
-                            window.__capturedProtocolUrl = url;
-                            return;
-                        }
-                        return origReplace.call(this, url);
-                    };
-                } catch(e) {}
-            """
-        })
-        print("Injected protocol redirect interceptor via CDP")
-    except Exception as e:
-        print(f"Could not inject interceptor (non-fatal): {e}")
+        if not intercepted.done():
+            current_url = page.url
+            if left_auth_pages(current_url):
+                print(f"Browser navigated away from checking page: {current_url}")
+                return None
+        done, _ = concurrent.futures.wait([intercepted, navigated_away], timeout=timeout,
+                                          return_when=concurrent.futures.FIRST_COMPLETED)
+        if intercepted in done:
+            return intercepted.result()["payload"]
+        if navigated_away in done:
+            print(f"Browser navigated away from checking page: {navigated_away.result()['frame']['url']}")
+        return None
+    finally:
+        navigated_away.cancel()
+
+
+# Hosts serving the Passport login pages
+AUTH_HOSTS = {urllib.parse.urlparse(origin).hostname for origin in AUTH_ORIGINS}
+
+def is_auth_url(url):
+    return urllib.parse.urlparse(url).hostname in AUTH_HOSTS
+
+def find_auth_page(browser, timeout=15, exclude=()):
+    """Return the tab Unity opened the auth URL in, once it shows the email input.
+
+    The tab is picked up from target events the moment it appears, rather than by polling the
+    open windows and probing each of them. Tabs in `exclude` are ignored. Raises TimeoutError."""
+    deadline = time.monotonic() + timeout
+    target = browser.wait_for_target(
+        lambda info: info["type"] == "page" and info["targetId"] not in exclude and is_auth_url(info["url"]),
+        timeout=timeout)
+    print(f"Found auth tab {target['targetId']}: {target['url']}")
+    page = browser.attach(target["targetId"])
+    page.wait_for_any(EMAIL_SELECTORS, timeout=max(1, deadline - time.monotonic()))
+    print(f"Found email input in tab: {target['targetId']}")
+    return page
 
+def login():
+    # Called right after LoginBtn is tapped
+    tapped_at = time.monotonic()
+    print("Connect to Brave via DevTools")
+    # Talk to the existing Brave browser instance directly over its DevTools websocket
+    with connect_browser() as browser:
+        _login_in_browser(browser, tapped_at)
+
+def report_email_field_time(seconds):
+    """Print how long the email field took to appear after the tap, compared with runs in the other prewarm mode."""
+    timings = StatsStore(TIMINGS_PATH)
+    mode, other = ("prewarmed", "cold") if prewarm_targets else ("cold", "prewarmed")
+    report = f"Email field appeared {seconds:.2f}s after LoginBtn tap ({mode} auth origin)"
+    other_average = timings.section("tap_to_email").get(other)
+    if other_average is not None:
+        saved = other_average - seconds if mode == "prewarmed" else seconds - other_average
+        report += f", {saved:.2f}s saved by prewarming (average {other} run: {other_average:.2f}s)"
+    print(report)
+    timings.record_average("tap_to_email", mode, seconds)
+    timings.save()
+
+def _login_in_browser(browser, tapped_at):
     # HYBRID APPROACH: Try multi-window detection first (proven to work in CI), 
     # then fall back to Unity log monitoring if needed
+    intercepted = None
     
     print("Attempting multi-window detection (primary method - proven to work)...")
     try:
         # Wait for Unity to open auth URL in new browser window
         print("Waiting for new window...")
-        WebDriverWait(driver, 15).until(EC.number_of_windows_to_be(2))
-        
-        # Get all window handles
-        all_windows = driver.window_handles
-        print(f"Found {len(all_windows)} windows to check: {all_windows}")
-        
-        # Find the window with email input
-        target_window = None
-        for window in all_windows:
-            try:
-                print(f"Checking window: {window}")
-                driver.switch_to.window(window)
-                # Try to find email input in this window
-                email_field = driver.find_element(By.CSS_SELECTOR, '[data-testid="TextInput__input"]')
-                target_window = window
-                print(f"Found email input in window: {window}")
-                break
-            except:
-                print(f"Email input not found in window: {window}, trying next...")
-                continue
-
-        if target_window:
-            print("Switch to the target window")
-            driver.switch_to.window(target_window)
-            print("Multi-window detection successful - proceeding with login flow")
-        else:
-            raise Exception("No window with email input found")
+        page = find_auth_page(browser, exclude=prewarm_targets)
+        print("Multi-window detection successful - proceeding with login flow")
+        report_email_field_time(time.monotonic() - tapped_at)
             
     except Exception as e:
         print(f"Multi-window detection failed: {e}")
@@ -392,223 +440,109 @@ def login():
         
         # FALLBACK: Unity log monitoring approach
         print("Looking for auth URL in Unity logs...")
-        auth_url = None
-        for attempt in range(30):  # Try for 30 seconds
-            auth_url = get_auth_url_from_unity_logs()
-            if auth_url:
-                break
-            time.sleep(1)
+        # Unity has usually logged the URL by now, so only look at the end of the log first
+        auth_url = get_auth_url_from_unity_logs(latest=True, login_only=True)
+        if not auth_url:
+            auth_event = wait_for_unity_log_event(AUTH_URL, timeout=30)
+            auth_url = auth_event.value if auth_event else None
         
         if auth_url:
             print(f"Navigating to captured auth URL: {auth_url}")
-            driver.get(auth_url)
+            page = attach_controlled_page(browser)
+            intercepted = intercept_protocol_redirects(page)
+            page.navigate(auth_url)
             
             # Debug: Check what page we landed on
             time.sleep(5)  # Give more time for potential redirects
-            print(f"After navigation - URL: {driver.current_url}")
-            print(f"After navigation - Title: {driver.title}")
+            print(f"After navigation - URL: {page.url}")
+            print(f"After navigation - Title: {page.title}")
             
             # Check if we have email field (login page) or if we skipped to redirect
-            try:
-                email_field = driver.find_element(By.CSS_SELECTOR, '[data-testid="TextInput__input"]')
+            if page.find_first(EMAIL_SELECTORS):
                 print("Found email field via Unity log method - proceeding with login flow")
-            except:
+            else:
                 print("No email field found - checking if we got redirected to new tab...")
                 
                 # If we ended up on chrome://newtab/ or similar, the redirect already happened
-                if 'newtab' in driver.current_url or 'about:blank' in driver.current_url:
+                current_url = page.url
+                if 'newtab' in current_url or 'about:blank' in current_url:
                     print("Browser redirected to new tab - cached session triggered immutablerunner:// callback")
                     print("Protocol handler should have delivered the callback to Unity")
                     
-                    product_name = os.getenv("UNITY_APP_NAME", get_product_name())
-                    log_path = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "Immutable", product_name, "Player.log")
+                    log_path = get_unity_log_paths()[0]
                     
-                    auth_success = False
-                    for check_attempt in range(30):
-                        try:
-                            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                                if any(phrase in content for phrase in [
-                                    "AuthenticatedScene",
-                                    "COMPLETE_LOGIN_PKCE",
-                                    "LoginPKCESuccess",
-                                    "HandleLoginPkceSuccess",
-                                ]):
-                                    print("Authentication success detected in Unity logs!")
-                                    auth_success = True
-                                    break
-                        except:
-                            pass
-                        time.sleep(1)
+                    auth_success = wait_for_unity_log_event(LOGIN_SUCCESS, log_path=log_path) is not None
                     
                     if auth_success:
+                        print("Authentication success detected in Unity logs!")
                         print("Cached authentication confirmed successful via Unity logs")
                     else:
                         print("Could not confirm authentication via Unity logs after 30s")
+                        error = get_unity_log_monitor(log_path).latest(ERROR)
+                        if error:
+                            print(f"Last error in Unity logs: {error.value}")
                     
                     return
                 else:
                     print("Unexpected page state - handling as cached session...")
-                    return handle_cached_authentication(driver)
+                    return handle_cached_authentication(page)
         else:
             print("Could not find auth URL in Unity logs either!")
-            driver.quit()
-            return
-
-    wait = WebDriverWait(driver, 60)
-
-    print("Wait for email input...")
-    email_field = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="TextInput__input"]')))
-    print("Enter email...")
-    email_field.send_keys(EMAIL)
-    
-    # Try to find and click the submit button (arrow button)
-    submit_selectors = [
-        'button[type="submit"]',                    # Primary - always works
-        'button[data-testid*="submit"]',           # Fallback with testid
-        'form button'                              # Last resort - any form button
-    ]
-    
-    button_clicked = False
-    for selector in submit_selectors:
-        try:
-            submit_button = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-            submit_button.click()
-            print(f"Successfully clicked submit button with selector: {selector}")
-            button_clicked = True
-            break
-        except Exception as e:
-            print(f"Submit button selector {selector} failed: {e}")
-            continue
-    
-    if not button_clicked:
-        print("No submit button found with any selector, trying Enter key...")
-        email_field.send_keys(Keys.RETURN)
-        print("Pressed Enter key")
-    
-    print("Email submission attempted")
-
-    # Wait for the OTP to arrive and page to load
-    print("Wait for OTP...")
-    time.sleep(10)
-
-    print("Get OTP from MailSlurp...")
-    code = fetch_code()
-    if code:
-        print(f"Successfully fetched OTP: {code}")
-    else:
-        print("Failed to fetch OTP from MailSlurp - checking if authentication completed anyway...")
-        
-        # Sometimes Auth0 doesn't send OTP emails in test environments
-        # Check if we can proceed anyway or if this is a cached session scenario
-        try:
-            # Check if we're already past the OTP stage
-            current_url = driver.current_url
-            print(f"Current URL after OTP timeout: {current_url}")
-            
-            # If we're at a success/callback page, authentication may have completed
-            if any(keyword in current_url.lower() for keyword in ['success', 'callback', 'complete', 'checking']):
-                print("Already at success page - proceeding without OTP")
-                print("Waiting for Unity to receive the callback...")
-                time.sleep(10)
-                return
-            
-            # Otherwise this is a real OTP failure
-            print("No OTP received and not at success page - authentication failed")
-            driver.quit()
-            return
-        except Exception as e:
-            print(f"Error checking page state after OTP timeout: {e}")
-            driver.quit()
             return
 
-    print("Find OTP input...")
-    print(f"Current URL after email submission: {driver.current_url}")
-    print(f"Page title after email submission: {driver.title}")
-    
-    # Try multiple selectors for OTP input field
-    otp_selectors = [
-        'input[data-testid="passwordless_passcode__TextInput--0__input"]',  # Primary - always works
-        'input[data-testid*="passcode"]',      # Fallback - partial testid match
-        'input[type="text"][maxlength="6"]'    # Last resort - by input characteristics
-    ]
-    
-    otp_field = None
-    for selector in otp_selectors:
-        try:
-            otp_field = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-            print(f"Found OTP field with selector: {selector}")
-            break
-        except:
-            continue
-    
-    if not otp_field:
-        print("Could not find OTP input field with any selector!")
-        print("Page source snippet:")
-        print(driver.page_source[:2000])  # First 2000 chars for debugging
-        raise Exception("OTP input field not found")
-    print("Enter OTP")
-    otp_field.send_keys(code)
+    # Intercept the immutablerunner:// redirect on this tab, from now on and in later documents
+    try:
+        if intercepted is None:
+            intercepted = intercept_protocol_redirects(page)
+        print("Injected protocol redirect interceptor via CDP")
+    except Exception as e:
+        print(f"Could not inject interceptor (non-fatal): {e}")
 
-    print("Wait for success page...")
-    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'h1[data-testid="checking_title"]')))
-    print("Connected to Passport!")
+    # Skip images, fonts and analytics on the auth pages when BLOCK_REQUESTS is set
+    request_filter = RequestFilter(page).start()
+    cache_monitor = CacheMonitor(page).start()
+    login_duration = None
 
-    # Handle optional consent screen (shouldn't appear normally but sometimes does)
+    # Work through the email, OTP and consent pages, probing the page state once per tick
     try:
-        print("Checking for consent screen...")
-        consent_yes_button = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, "//button[text()='Yes' or contains(text(), 'Yes')]"))
-        )
-        consent_yes_button.click()
-        print("Clicked 'Yes' on consent screen")
-    except:
-        print("No consent screen found (expected behavior)")
+        start = time.monotonic()
+        result = drive_login(page, EMAIL, start_otp_wait, AUTH_HOSTS, callback=intercepted)
+        login_duration = time.monotonic() - start
+    except OTPNotReceived as e:
+        print(f"{e} - authentication failed")
+        print(f"Current URL: {page.url}")
+        return
+    except LoginError:
+        print(f"Current URL: {page.url}")
+        print("Page source snippet:")
+        print(page.content()[:2000])  # First 2000 chars for debugging
+        raise
+    finally:
+        request_filter.stop("login", login_duration)
+        cache_monitor.stop("login")
+
+    if result["state"] == REDIRECTED:
+        print(f"Browser left the login pages: {result['detail']}")
+    else:
+        print("Connected to Passport!")
 
     # The checking page will try to redirect to immutablerunner://callback?code=...&state=...
-    # Our injected CDP script intercepts this URL. We poll for it, then invoke it directly
-    # from the OS -- bypassing Brave's protocol permission dialog entirely.
+    # Our injected CDP script intercepts this URL and pushes it to us through the binding. We
+    # then invoke it directly from the OS -- bypassing Brave's protocol permission dialog entirely.
     print("Waiting for callback URL to be intercepted...")
-    print(f"Current URL: {driver.current_url}")
+    print(f"Current URL: {page.url}")
 
     callback_url = None
-    for wait_i in range(30):
-        time.sleep(1)
-        try:
-            # Check if our interceptor captured the URL
-            url = driver.execute_script("return window.__capturedProtocolUrl")
-            if url:
-                callback_url = url
-                print(f"Intercepted callback URL: {url[:100]}...")
-                break
-
-            # Also check if the browser navigated away (deep link fired natively)
-            current_url = driver.current_url
-            if 'checking' not in current_url and 'auth.immutable.com' not in current_url:
-                print(f"Browser navigated away from checking page: {current_url}")
-                break
-
-            # Try clicking any in-page "Open" / "Allow" button
-            for btn in driver.find_elements(By.TAG_NAME, "button"):
-                try:
-                    text = btn.text.strip()
-                    if text and any(kw in text for kw in ['Open', 'Allow']):
-                        btn.click()
-                        print(f"Clicked deep link dialog button: '{text}'")
-                        break
-                except:
-                    pass
-        except Exception as e:
-            if wait_i % 10 == 9:
-                print(f"Deep link poll iteration {wait_i}: {e}")
+    if intercepted is not None:
+        start = time.monotonic()
+        callback_url = wait_for_callback_url(page, intercepted)
+        if callback_url:
+            print(f"Intercepted callback URL after {time.monotonic() - start:.3f}s: {callback_url[:100]}...")
 
     if callback_url:
         print("Invoking deep link directly via OS (bypassing browser dialog)...")
         try:
-            subprocess.run(
-                ["powershell", "-Command", f"Start-Process '{callback_url}'"],
-                capture_output=True, timeout=10
-            )
+            run_powershell(f"Start-Process '{callback_url}'", timeout=10)
             print("Deep link invoked via OS")
         except Exception as e:
             print(f"OS invocation failed: {e}")
@@ -681,11 +615,19 @@ def open_sample_app(clear_data=False):
         f"./{product_name}.exe",  # Explicit current directory
     ])
     
+    # Anything already in the log belongs to the previous run of the app
+    begin_unity_log_session()
+
+    # Only does anything with DISK_CACHE_DIR set and the browser not running yet
+    if not devtools_available():
+        cache_warmer.start()
+
     exe_launched = False
     for exe_path in exe_paths:
         if os.path.exists(exe_path):
             print(f"Found executable at: {os.path.abspath(exe_path)}")
-            subprocess.Popen([exe_path], shell=True)
+            # No shell, so the tracked PID is the player itself rather than cmd.exe
+            supervisor.track(subprocess.Popen([exe_path]), "unity-app")
             exe_launched = True
             break
     
@@ -696,24 +638,31 @@ def open_sample_app(clear_data=False):
             print(f"  - {abs_path} (exists: {os.path.exists(abs_path)})")
         raise FileNotFoundError(f"Unity executable not found")
     
-    time.sleep(10)
-    print(f"{product_name} opened successfully.")
+    # Unity truncates or recreates Player.log on startup, so once the new session has logged
+    # something and the AltTester server is reachable the app is ready for AltDriver
+    try:
+        cold_start = wait_for_app_ready(log_ready=get_unity_log_monitor(get_unity_log_paths()[0]).session_started,
+                                        timeout=30)
+        print(f"{product_name} opened successfully (ready after {cold_start:.2f}s).")
+    except WaitTimeout as e:
+        print(f"{e} - continuing anyway")
+        print(f"{product_name} opened.")
 
 def stop_sample_app():
     product_name = os.getenv("UNITY_APP_NAME", get_product_name())
     print(f"Stopping {product_name}...")
-    powershell_command = f"""
-    $process = Get-Process -Name "{product_name}" -ErrorAction SilentlyContinue
-    if ($process) {{
-        Stop-Process -Id $process.Id
-        Write-Output "{product_name}.exe has been closed."
-    }} else {{
-        Write-Output "{product_name}.exe is not running."
-    }}
-    """
-    subprocess.run(["powershell.exe", "-Command", powershell_command], check=True)
-    time.sleep(5)
-    print(f"{product_name} stopped successfully.")
+    # Also pick up instances we didn't launch, e.g. one started by the immutablerunner:// deep link
+    for pid in find_pids(product_name):
+        supervisor.track(pid, "unity-app")
+    if not supervisor.pids("unity-app"):
+        print(f"{product_name}.exe is not running.")
+        return
+    # Ask the app to close and wait for it to actually exit, killing it if it hangs
+    start = time.monotonic()
+    if supervisor.stop("unity-app", timeout=10):
+        print(f"{product_name} stopped successfully (exited after {time.monotonic() - start:.2f}s).")
+    else:
+        print(f"{product_name} may still be running.")
 
 def bring_sample_app_to_foreground():
     product_name = os.getenv("UNITY_APP_NAME", get_product_name())
@@ -721,14 +670,13 @@ def bring_sample_app_to_foreground():
 
     print(f"Bring {product_name} to the foreground.")
 
-    command = [
-        "powershell.exe",
-        "-ExecutionPolicy", "Bypass",
-        "-File", powershell_script_path,
-        "-appName", product_name
-    ]
-
-    subprocess.run(command, check=True)
+    result = run_powershell(f"& '{os.path.abspath(powershell_script_path)}' -appName '{product_name}'")
+    if result.stdout.strip():
+        print(result.stdout.strip())
+    if result.returncode != 0:
+        print(result.stderr)
+        raise subprocess.CalledProcessError(result.returncode, powershell_script_path,
+                                            output=result.stdout, stderr=result.stderr)
     time.sleep(10)
 
 def get_brave_default_profile_dir():
@@ -737,97 +685,13 @@ def get_brave_default_profile_dir():
     return os.path.join(local_app_data, "BraveSoftware", "Brave-Browser", "User Data", "Default")
 
 def ensure_browser_clean():
-    """Kill any running Brave/chromedriver processes and clean session data so Brave
-    starts cleanly without restoring previous tabs (mirrors the Mac helper approach)."""
-    # Kill all Brave processes
-    subprocess.run(["powershell.exe", "-Command",
-                    'Get-Process | Where-Object { $_.Name -like "*brave*" } | Stop-Process -Force -ErrorAction SilentlyContinue'],
-                   capture_output=True, timeout=10)
-    subprocess.run(["powershell.exe", "-Command",
-                    'Get-Process -Name "chromedriver" -ErrorAction SilentlyContinue | Stop-Process -Force -ErrorAction SilentlyContinue'],
-                   capture_output=True, timeout=10)
-    time.sleep(2)
-
-    brave_profile = get_brave_default_profile_dir()
-
-    import shutil
-    for session_dir_name in ("Sessions", "Session Storage"):
-        session_dir = os.path.join(brave_profile, session_dir_name)
-        if os.path.isdir(session_dir):
-            shutil.rmtree(session_dir, ignore_errors=True)
-            print(f"Removed {session_dir_name} directory")
-
-    import json
-    prefs_path = os.path.join(brave_profile, "Preferences")
-    try:
-        if os.path.exists(prefs_path):
-            with open(prefs_path, "r") as f:
-                prefs = json.load(f)
-            prefs.setdefault("profile", {})["exit_type"] = "Normal"
-            prefs["profile"]["exited_cleanly"] = True
-            prefs.setdefault("session", {})["restore_on_startup"] = 5
-            with open(prefs_path, "w") as f:
-                json.dump(prefs, f)
-            print("Patched Preferences: exit_type=Normal, restore_on_startup=NewTab")
-    except Exception as e:
-        print(f"Could not patch Preferences: {e}")
-
-def setup_browser_permissions():
-    """Merge protocol-handler permissions into Brave's default profile Preferences."""
-    print("Setting up browser permissions for auth.immutable.com...")
-
-    brave_profile = get_brave_default_profile_dir()
-    os.makedirs(brave_profile, exist_ok=True)
-
-    import json
-    permissions_overlay = {
-        "profile": {
-            "content_settings": {
-                "exceptions": {
-                    "protocol_handler": {
-                        "https://auth.immutable.com,*": {
-                            "setting": 1,
-                            "last_modified": "13000000000000000"
-                        }
-                    }
-                }
-            }
-        },
-        "protocol_handler": {
-            "excluded_schemes": {
-                "immutablerunner": False
-            }
-        },
-        "custom_handlers": {
-            "enabled": True
-        }
-    }
-
-    prefs_file = os.path.join(brave_profile, "Preferences")
-
-    try:
-        existing = {}
-        if os.path.exists(prefs_file):
-            with open(prefs_file, 'r') as f:
-                try:
-                    existing = json.load(f)
-                except json.JSONDecodeError:
-                    pass
-
-        def deep_merge(base, override):
-            for k, v in override.items():
-                if k in base and isinstance(base[k], dict) and isinstance(v, dict):
-                    deep_merge(base[k], v)
-                else:
-                    base[k] = v
+    """Kill any running Brave/chromedriver processes and reset the profile from the prebuilt
+    template, so Brave starts cleanly without restoring previous tabs and with the
+    immutablerunner:// protocol handler allowed for auth.immutable.com."""
+    # Kill all Brave and chromedriver processes, and wait until they are gone so the profile is unlocked
+    kill_browser_processes()
 
-        deep_merge(existing, permissions_overlay)
-
-        with open(prefs_file, 'w') as f:
-            json.dump(existing, f, indent=2)
-        print("Browser permissions configured to allow auth.immutable.com")
-    except Exception as e:
-        print(f"Browser permission setup error: {e}")
+    prepare_profile(get_brave_default_profile_dir(), [CLEAN_EXIT_PREFS, PROTOCOL_HANDLER_PREFS])
 
 def find_unity_executable():
     """Find the Unity executable path using the same logic as open_sample_app()."""
@@ -885,8 +749,7 @@ def setup_protocol_association():
     '''
 
     try:
-        result = subprocess.run(["powershell", "-Command", ps_script],
-                              capture_output=True, text=True, timeout=10)
+        result = run_powershell(ps_script, timeout=10)
         output = result.stdout.strip()
         print(output)
         if "successfully" in output:
@@ -927,28 +790,40 @@ def setup_browser_policy():
     '''
 
     try:
-        result = subprocess.run(["powershell", "-Command", ps_script],
-                              capture_output=True, text=True, timeout=10)
+        result = run_powershell(ps_script, timeout=10)
         print(result.stdout.strip())
     except Exception as e:
         print(f"Browser policy setup error: {e}")
 
 def launch_browser():
+    if BROWSER_POOL and devtools_available():
+        # Reuse the warm browser from the previous flow instead of cold-starting a new one
+        print("Reusing pooled Brave instance...")
+        try:
+            reset_browser()
+            prewarm_auth_origin()
+            return
+        except Exception as e:
+            print(f"Could not reset pooled browser ({e}), restarting it")
+
     print("Starting Brave...")
 
+    # The warm-up instance must be done with the cache directory before Brave uses it
+    if not cache_warmer.wait(timeout=5):
+        print("Browser cache warm-up didn't finish in time, stopped it")
+
     # Clean up any existing Brave/chromedriver processes and stale session data.
     # This ensures our instance is the ONLY Brave running so that Unity's
     # Application.OpenURL() opens the auth page in the same browser we control
     # via remote debugging (instead of spawning a second uncontrolled instance).
     ensure_browser_clean()
 
-    # Set up protocol handler, browser permissions, and enterprise policy
+    # Set up protocol handler and enterprise policy (browser permissions come with the profile template)
     setup_protocol_association()
     setup_browser_policy()
-    setup_browser_permissions()
 
     browser_paths = [
-        r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+        BRAVE_PATH
     ]
 
     browser_path = None
@@ -983,6 +858,8 @@ def launch_browser():
         '--disable-renderer-backgrounding',
         '--disable-session-crashed-bubble',
     ]
+    # Keep the HTTP cache outside the profile so it survives the session cleanup
+    browser_args.extend(cache_args())
 
     is_ci = os.getenv('CI') or os.getenv('GITHUB_ACTIONS') or os.getenv('BUILD_ID')
     if is_ci:
@@ -995,35 +872,60 @@ def launch_browser():
         ])
 
     args_string = "', '".join(browser_args)
-    result = subprocess.run([
-        "powershell.exe",
-        "-Command",
+    result = run_powershell(
         f"$process = Start-Process -FilePath '{browser_path}' -ArgumentList '{args_string}' -PassThru; Write-Output $process.Id"
-    ], capture_output=True, text=True, check=True)
+    )
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, "Start-Process", output=result.stdout)
 
     global debug_browser_pid
     debug_browser_pid = result.stdout.strip()
     print(f"Debug browser launched with PID: {debug_browser_pid}")
+    if debug_browser_pid.isdigit():
+        supervisor.track(debug_browser_pid, "browser")
+
+    # Only block until the DevTools endpoint is up rather than for a fixed time
+    version, startup_latency = wait_for_devtools(timeout=30)
+    print(f"{version.get('Browser', 'Brave')} DevTools ready after {startup_latency:.2f}s")
+    prewarm_auth_origin()
+
+def prewarm_auth_origin():
+    """Open the auth origin in a background tab, so the login tab Unity opens later renders from
+    warm DNS, TLS connections and cached assets."""
+    global prewarm_targets
+    prewarm_targets = []
+    if not PREWARM_AUTH:
+        return
+    try:
+        prewarm_targets = prewarm_origins()
+        print(f"Prewarming auth origin in background tab(s): {', '.join(prewarm_targets)}")
+    except Exception as e:
+        print(f"Could not prewarm auth origin (non-fatal): {e}")
+
+def kill_browser_processes():
+    """Force-kill every Brave process (browser, renderer, GPU, crashpad, etc.) and any orphaned
+    chromedriver, and wait for them to exit. Returns the number of processes that were running."""
+    pids = set(supervisor.pids("browser") + find_pids("*brave*") + find_pids("chromedriver"))
+    supervisor.stop("browser", graceful=False)
+    if pids and not stop_processes(pids, timeout=10, graceful=False):
+        print("Some browser processes did not exit in time")
+    return len(pids)
+
+def stop_browser(force=False):
+    """Stop Brave. In browser pool mode it is only reset and kept running, unless force=True."""
+    if BROWSER_POOL and not force:
+        try:
+            reset_browser()
+            print("Kept pooled Brave running")
+            return
+        except Exception as e:
+            print(f"Could not reset pooled browser ({e}), stopping it")
 
-    time.sleep(5)
-
-def stop_browser():
     print("Stopping Brave...")
-    powershell_command = """
-    # Kill all Brave processes (browser, renderer, GPU, crashpad, etc.)
-    $braveProcs = Get-Process | Where-Object { $_.Name -like "*brave*" } -ErrorAction SilentlyContinue
-    if ($braveProcs) {
-        $braveProcs | ForEach-Object {
-            Stop-Process -Id $_.Id -Force -ErrorAction SilentlyContinue
-        }
-        Write-Output "Stopped $($braveProcs.Count) Brave process(es)."
-    } else {
-        Write-Output "Brave is not running."
-    }
-    # Also kill any orphaned chromedriver processes
-    Get-Process -Name "chromedriver" -ErrorAction SilentlyContinue | Stop-Process -Force -ErrorAction SilentlyContinue
-    exit 0
-    """
-    subprocess.run(["powershell.exe", "-Command", powershell_command], check=False)
-    time.sleep(3)
+    start = time.monotonic()
+    count = kill_browser_processes()
+    if count:
+        print(f"Stopped {count} Brave process(es) in {time.monotonic() - start:.2f}s")
+    else:
+        print("Brave is not running.")
     print("Stopped Brave")
\ No newline at end of file